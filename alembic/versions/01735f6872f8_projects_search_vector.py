@@ -0,0 +1,47 @@
+"""projects search vector
+
+Revision ID: 01735f6872f8
+Revises: b6f1a9c2e437
+Create Date: 2025-02-25 10:41:07.518362
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '01735f6872f8'
+down_revision: Union[str, None] = 'b6f1a9c2e437'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'projects',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', name), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        'ix_projects_search_vector',
+        'projects',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_search_vector', table_name='projects', postgresql_using='gin')
+    op.drop_column('projects', 'search_vector')
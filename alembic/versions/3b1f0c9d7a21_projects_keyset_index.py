@@ -0,0 +1,26 @@
+"""projects keyset index
+
+Revision ID: 3b1f0c9d7a21
+Revises: 976646cb2282
+Create Date: 2025-02-03 10:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1f0c9d7a21'
+down_revision: Union[str, None] = '976646cb2282'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_projects_created_id', 'projects', ['created', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_created_id', table_name='projects')
@@ -0,0 +1,27 @@
+"""area of interest geojson text
+
+Revision ID: 5d7b2e9f0a64
+Revises: c4a9e7d3b812
+Create Date: 2025-02-14 16:05:52.117839
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7b2e9f0a64'
+down_revision: Union[str, None] = 'c4a9e7d3b812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows keep NULL and are rendered from the packed geometry on read.
+    op.add_column('areas_of_interest', sa.Column('geojson_text', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('areas_of_interest', 'geojson_text')
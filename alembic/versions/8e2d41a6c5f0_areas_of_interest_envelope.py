@@ -0,0 +1,62 @@
+"""areas of interest envelope
+
+Revision ID: 8e2d41a6c5f0
+Revises: 3b1f0c9d7a21
+Create Date: 2025-02-05 14:31:08.902417
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d41a6c5f0'
+down_revision: Union[str, None] = '3b1f0c9d7a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('areas_of_interest', sa.Column('min_lon', sa.Float(), nullable=True))
+    op.add_column('areas_of_interest', sa.Column('min_lat', sa.Float(), nullable=True))
+    op.add_column('areas_of_interest', sa.Column('max_lon', sa.Float(), nullable=True))
+    op.add_column('areas_of_interest', sa.Column('max_lat', sa.Float(), nullable=True))
+    op.execute(
+        """
+        UPDATE areas_of_interest AS aoi
+        SET min_lon = envelope.min_lon,
+            min_lat = envelope.min_lat,
+            max_lon = envelope.max_lon,
+            max_lat = envelope.max_lat
+        FROM (
+            SELECT a.id,
+                   min((point ->> 0)::float8) AS min_lon,
+                   min((point ->> 1)::float8) AS min_lat,
+                   max((point ->> 0)::float8) AS max_lon,
+                   max((point ->> 1)::float8) AS max_lat
+            FROM areas_of_interest AS a,
+                 jsonb_array_elements(a.geojson_data::jsonb -> 'geometry' -> 'coordinates') AS polygon,
+                 jsonb_array_elements(polygon) AS ring,
+                 jsonb_array_elements(ring) AS point
+            GROUP BY a.id
+        ) AS envelope
+        WHERE aoi.id = envelope.id
+        """
+    )
+    op.create_index(
+        'ix_areas_of_interest_envelope',
+        'areas_of_interest',
+        [sa.text('box(point(min_lon, min_lat), point(max_lon, max_lat))')],
+        unique=False,
+        postgresql_using='gist',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_areas_of_interest_envelope', table_name='areas_of_interest', postgresql_using='gist')
+    op.drop_column('areas_of_interest', 'max_lat')
+    op.drop_column('areas_of_interest', 'max_lon')
+    op.drop_column('areas_of_interest', 'min_lat')
+    op.drop_column('areas_of_interest', 'min_lon')
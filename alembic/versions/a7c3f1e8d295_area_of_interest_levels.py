@@ -0,0 +1,34 @@
+"""area of interest levels
+
+Revision ID: a7c3f1e8d295
+Revises: 5d7b2e9f0a64
+Create Date: 2025-02-17 11:22:40.518306
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3f1e8d295'
+down_revision: Union[str, None] = '5d7b2e9f0a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing areas get no levels and are served at full resolution
+    # until their geometry is replaced.
+    op.create_table('area_of_interest_levels',
+    sa.Column('area_of_interest_id', sa.String(length=36), nullable=False),
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('geojson_text', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['area_of_interest_id'], ['areas_of_interest.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('area_of_interest_id', 'level')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('area_of_interest_levels')
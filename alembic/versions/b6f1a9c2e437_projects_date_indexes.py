@@ -0,0 +1,38 @@
+"""projects date indexes
+
+Revision ID: b6f1a9c2e437
+Revises: e2b9d4c6a813
+Create Date: 2025-02-24 13:12:48.901227
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f1a9c2e437'
+down_revision: Union[str, None] = 'e2b9d4c6a813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_projects_active_range',
+        'projects',
+        [sa.text("daterange(start_date, end_date, '[]')")],
+        unique=False,
+        postgresql_using='gist',
+    )
+    op.create_index('ix_projects_start_date_id', 'projects', ['start_date', 'id'], unique=False)
+    op.create_index('ix_projects_end_date_id', 'projects', ['end_date', 'id'], unique=False)
+    op.create_index('ix_projects_name_id', 'projects', ['name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_name_id', table_name='projects')
+    op.drop_index('ix_projects_end_date_id', table_name='projects')
+    op.drop_index('ix_projects_start_date_id', table_name='projects')
+    op.drop_index('ix_projects_active_range', table_name='projects', postgresql_using='gist')
@@ -0,0 +1,116 @@
+"""packed area of interest geometry
+
+Revision ID: c4a9e7d3b812
+Revises: 8e2d41a6c5f0
+Create Date: 2025-02-11 09:48:21.330574
+
+"""
+import struct
+import sys
+from array import array
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a9e7d3b812'
+down_revision: Union[str, None] = '8e2d41a6c5f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# The packing code is frozen here on purpose, later changes to
+# src.geometry must not change what this migration writes.
+_HEADER = struct.Struct("<4sII")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pack(coordinates: list) -> bytes:
+    polygon_offsets = array("I", [0])
+    ring_offsets = array("I", [0])
+    values = array("d")
+    for polygon in coordinates:
+        for ring in polygon:
+            for lon, lat in ring:
+                values.append(lon)
+                values.append(lat)
+            ring_offsets.append(len(values) // 2)
+        polygon_offsets.append(len(ring_offsets) - 1)
+
+    header = _HEADER.pack(b"PMP1", len(polygon_offsets) - 1, len(ring_offsets) - 1)
+    offsets = _little_endian(polygon_offsets) + _little_endian(ring_offsets)
+    padding = b"\0" * (-(len(header) + len(offsets)) % 8)
+    return header + offsets + padding + _little_endian(values)
+
+
+def _unpack(data: bytes) -> dict:
+    _, polygon_count, ring_count = _HEADER.unpack_from(data)
+    offsets = array("I", data[_HEADER.size:_HEADER.size + 4 * (polygon_count + ring_count + 2)])
+    values_start = _HEADER.size + 4 * len(offsets)
+    values = array("d", data[values_start + (-values_start % 8):])
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        values.byteswap()
+
+    polygon_offsets, ring_offsets = offsets[:polygon_count + 1], offsets[polygon_count + 1:]
+    coordinates = [
+        [
+            [
+                [values[position], values[position + 1]]
+                for position in range(ring_offsets[ring] * 2, ring_offsets[ring + 1] * 2, 2)
+            ]
+            for ring in range(polygon_offsets[polygon], polygon_offsets[polygon + 1])
+        ]
+        for polygon in range(polygon_count)
+    ]
+    return {"type": "Feature", "geometry": {"type": "MultiPolygon", "coordinates": coordinates}}
+
+
+def _convert(source: str, target: str, convert) -> None:
+    areas = sa.table(
+        'areas_of_interest',
+        sa.column('id', sa.String),
+        sa.column(source, sa.JSON if source == 'geojson_data' else sa.LargeBinary),
+        sa.column(target, sa.JSON if target == 'geojson_data' else sa.LargeBinary),
+    )
+    bind = op.get_bind()
+    update = (
+        sa.update(areas)
+        .where(areas.c.id == sa.bindparam('row_id'))
+        .values({target: sa.bindparam('value')})
+    )
+    last_id = ''
+    while True:
+        batch = bind.execute(
+            sa.select(areas.c.id, areas.c[source])
+            .where(areas.c.id > last_id)
+            .order_by(areas.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not batch:
+            break
+        bind.execute(update, [{'row_id': row_id, 'value': convert(value)} for row_id, value in batch])
+        last_id = batch[-1].id
+
+
+def upgrade() -> None:
+    op.add_column('areas_of_interest', sa.Column('geometry', sa.LargeBinary(), nullable=True))
+    _convert('geojson_data', 'geometry', lambda value: _pack(value['geometry']['coordinates']))
+    op.alter_column('areas_of_interest', 'geometry', nullable=False)
+    op.drop_column('areas_of_interest', 'geojson_data')
+
+
+def downgrade() -> None:
+    op.add_column('areas_of_interest', sa.Column('geojson_data', sa.JSON(), nullable=True))
+    _convert('geometry', 'geojson_data', _unpack)
+    op.alter_column('areas_of_interest', 'geojson_data', nullable=False)
+    op.drop_column('areas_of_interest', 'geometry')
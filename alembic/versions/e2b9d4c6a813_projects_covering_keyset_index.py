@@ -0,0 +1,30 @@
+"""projects covering keyset index
+
+Revision ID: e2b9d4c6a813
+Revises: a7c3f1e8d295
+Create Date: 2025-02-19 10:37:05.264419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b9d4c6a813'
+down_revision: Union[str, None] = 'a7c3f1e8d295'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Summary pages of name and dates are answered from the index alone.
+    op.drop_index('ix_projects_created_id', table_name='projects')
+    op.create_index(
+        'ix_projects_created_id', 'projects', ['created', 'id'], unique=False,
+        postgresql_include=['name', 'start_date', 'end_date'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_created_id', table_name='projects')
+    op.create_index('ix_projects_created_id', 'projects', ['created', 'id'], unique=False)
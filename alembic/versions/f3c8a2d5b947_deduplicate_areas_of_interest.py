@@ -0,0 +1,117 @@
+"""deduplicate areas of interest
+
+Revision ID: f3c8a2d5b947
+Revises: 01735f6872f8
+Create Date: 2025-03-03 09:12:51.804217
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8a2d5b947'
+down_revision: Union[str, None] = '01735f6872f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+AREA_COLUMNS = ('created', 'modified', 'geometry', 'geojson_text', 'min_lon', 'min_lat', 'max_lon', 'max_lat')
+
+
+def upgrade() -> None:
+    op.add_column('areas_of_interest', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('areas_of_interest', sa.Column('reference_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('projects', sa.Column('area_of_interest_id', sa.String(length=36), nullable=True))
+    op.execute(
+        "UPDATE projects SET area_of_interest_id = areas_of_interest.id "
+        "FROM areas_of_interest WHERE areas_of_interest.project_id = projects.id"
+    )
+    # Same digest as src.geometry.content_hash of the packed geometry.
+    op.execute("UPDATE areas_of_interest SET content_hash = encode(sha256(geometry), 'hex')")
+
+    # Projects with the same geometry share the area with the smallest id,
+    # the other copies and their levels are deleted.
+    op.execute(
+        "UPDATE projects SET area_of_interest_id = kept.id "
+        "FROM areas_of_interest AS duplicate "
+        "JOIN (SELECT content_hash, min(id) AS id FROM areas_of_interest GROUP BY content_hash) AS kept "
+        "ON kept.content_hash = duplicate.content_hash "
+        "WHERE projects.area_of_interest_id = duplicate.id AND duplicate.id <> kept.id"
+    )
+    op.execute(
+        "DELETE FROM areas_of_interest WHERE NOT EXISTS "
+        "(SELECT 1 FROM projects WHERE projects.area_of_interest_id = areas_of_interest.id)"
+    )
+    op.execute(
+        "UPDATE areas_of_interest SET reference_count = "
+        "(SELECT count(*) FROM projects WHERE projects.area_of_interest_id = areas_of_interest.id)"
+    )
+
+    op.alter_column('areas_of_interest', 'content_hash', nullable=False)
+    op.create_index('ix_areas_of_interest_content_hash', 'areas_of_interest', ['content_hash'], unique=True)
+    op.drop_column('areas_of_interest', 'project_id')
+    op.create_foreign_key(
+        'projects_area_of_interest_id_fkey', 'projects', 'areas_of_interest', ['area_of_interest_id'], ['id']
+    )
+    op.create_index('ix_projects_area_of_interest_id', 'projects', ['area_of_interest_id'], unique=False)
+
+    op.create_table('area_of_interest_uploads',
+    sa.Column('upload_hash', sa.String(length=64), nullable=False),
+    sa.Column('area_of_interest_id', sa.String(length=36), nullable=False),
+    sa.ForeignKeyConstraint(['area_of_interest_id'], ['areas_of_interest.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('upload_hash')
+    )
+    op.create_index(
+        'ix_area_of_interest_uploads_area_of_interest_id',
+        'area_of_interest_uploads',
+        ['area_of_interest_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_area_of_interest_uploads_area_of_interest_id', table_name='area_of_interest_uploads')
+    op.drop_table('area_of_interest_uploads')
+
+    op.drop_index('ix_areas_of_interest_content_hash', table_name='areas_of_interest')
+    op.add_column('areas_of_interest', sa.Column('project_id', sa.String(length=36), nullable=True))
+    # Every project gets its own area again: the first project keeps the
+    # shared row, the others get copies of it and of its levels.
+    op.execute(
+        "UPDATE areas_of_interest SET project_id = "
+        "(SELECT min(projects.id) FROM projects WHERE projects.area_of_interest_id = areas_of_interest.id)"
+    )
+    columns = ', '.join(AREA_COLUMNS)
+    shared_columns = ', '.join(f'shared.{column}' for column in AREA_COLUMNS)
+    op.execute(
+        f"INSERT INTO areas_of_interest (id, project_id, content_hash, {columns}) "
+        f"SELECT gen_random_uuid()::text, projects.id, shared.content_hash, {shared_columns} "
+        "FROM projects JOIN areas_of_interest AS shared ON shared.id = projects.area_of_interest_id "
+        "WHERE shared.project_id <> projects.id"
+    )
+    op.execute(
+        "INSERT INTO area_of_interest_levels (area_of_interest_id, level, geojson_text) "
+        "SELECT copy.id, levels.level, levels.geojson_text "
+        "FROM areas_of_interest AS copy "
+        "JOIN projects ON projects.id = copy.project_id "
+        "JOIN area_of_interest_levels AS levels ON levels.area_of_interest_id = projects.area_of_interest_id "
+        "WHERE copy.id <> projects.area_of_interest_id"
+    )
+    op.execute("DELETE FROM areas_of_interest WHERE project_id IS NULL")
+    op.alter_column('areas_of_interest', 'project_id', nullable=False)
+    op.create_foreign_key(
+        'areas_of_interest_project_id_fkey',
+        'areas_of_interest',
+        'projects',
+        ['project_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+
+    op.drop_index('ix_projects_area_of_interest_id', table_name='projects')
+    op.drop_constraint('projects_area_of_interest_id_fkey', 'projects', type_='foreignkey')
+    op.drop_column('projects', 'area_of_interest_id')
+    op.drop_column('areas_of_interest', 'reference_count')
+    op.drop_column('areas_of_interest', 'content_hash')
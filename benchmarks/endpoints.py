@@ -0,0 +1,240 @@
+"""Throughput, latency and memory of the project endpoints under concurrent load.
+
+Every endpoint is driven through a create, get, list, update, delete cycle
+for each area of interest size. By default the app runs in process behind
+httpx's ASGITransport, against the database configured by the environment,
+``--url`` targets a running server instead, e.g. uvicorn. Peak RSS is read
+from /proc, for a remote server pass its ``--server-pid``.
+
+Every create uploads a distinct geometry unless ``--duplicate-uploads``
+sends the same bytes each time, which after the first create only takes a
+reference to the stored area of interest.
+
+Run with ``python -m benchmarks.endpoints``. ``--save-baseline`` stores the
+results, ``--baseline`` compares against stored results and exits with 1
+when an endpoint got slower than ``--tolerance`` allows.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.synthetic import multipolygon_feature
+
+ENDPOINTS = ("create", "get", "list", "update", "delete")
+
+
+def percentile(latencies: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted ``latencies``."""
+    index = max(round(q / 100 * len(latencies)) - 1, 0)
+    return latencies[min(index, len(latencies) - 1)]
+
+
+def peak_rss_mb(pid: int | None) -> float | None:
+    """High-water mark of the resident set size, None where /proc is unavailable."""
+    if pid is None:
+        return None
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss(pid: int | None) -> None:
+    """Start a new high-water mark so the peak belongs to the next endpoint."""
+    if pid is None:
+        return
+    try:
+        Path(f"/proc/{pid}/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+async def run(client: AsyncClient, request, count: int, concurrency: int) -> dict:
+    """Send ``count`` requests from ``concurrency`` workers, ``request(i)`` sends the i-th."""
+    latencies: list[float] = []
+    errors = 0
+    pending = iter(range(count))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in pending:
+            start = time.perf_counter()
+            response = await request(index)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": count,
+        "errors": errors,
+        "requests_per_s": round(count / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def distinct_upload(area_of_interest: bytes, index: int) -> bytes:
+    """``area_of_interest`` with a small extra polygon, so every index has its own geometry."""
+    lon = float(index)
+    polygon = f",[[[{lon},1.0],[{lon + 0.5},1.0],[{lon + 0.5},1.5],[{lon},1.0]]]"
+    # Inserted before the "]}}" closing the coordinates, geometry and feature.
+    return area_of_interest[:-3] + polygon.encode() + area_of_interest[-3:]
+
+
+async def benchmark_size(
+    client: AsyncClient,
+    vertices: int,
+    count: int,
+    concurrency: int,
+    pid: int | None,
+    duplicate_uploads: bool = False,
+) -> list[dict]:
+    area_of_interest = json.dumps(multipolygon_feature(vertices)).encode()
+    data = json.dumps(
+        {
+            "name": "benchmark",
+            "description": "endpoint benchmark",
+            "date_range": {"start": "2025-01-01", "end": "2025-12-31"},
+        }
+    )
+    ids: list[str | None] = [None] * count
+
+    async def create(index: int):
+        upload = area_of_interest
+        if not duplicate_uploads:
+            upload = distinct_upload(area_of_interest, index)
+        response = await client.post(
+            "/v1/project",
+            files={"area_of_interest": ("aoi.json", upload, "application/json")},
+            data={"data": data},
+        )
+        if response.status_code == 200:
+            ids[index] = response.json()["id"]
+        return response
+
+    async def get(index: int):
+        return await client.get(f"/v1/project/{ids[index]}")
+
+    async def list_(index: int):
+        return await client.get("/v1/project", params={"page_size": 10})
+
+    async def update(index: int):
+        return await client.patch(
+            f"/v1/project/{ids[index]}", data={"data": json.dumps({"name": f"b{index}"})}
+        )
+
+    async def delete(index: int):
+        return await client.delete(f"/v1/project/{ids[index]}")
+
+    requests = dict(zip(ENDPOINTS, (create, get, list_, update, delete)))
+    results = []
+    for endpoint, request in requests.items():
+        reset_peak_rss(pid)
+        result = await run(client, request, count, concurrency)
+        results.append(
+            {
+                "endpoint": endpoint,
+                "vertices": vertices,
+                "bytes": len(area_of_interest),
+                **result,
+                "peak_rss_mb": peak_rss_mb(pid),
+            }
+        )
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[dict]:
+    """Endpoints whose p95 latency or throughput is worse than ``tolerance`` allows."""
+    previous = {(result["endpoint"], result["vertices"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["endpoint"], result["vertices"]))
+        if before is None:
+            continue
+        if (
+            result["p95_ms"] > before["p95_ms"] * (1 + tolerance)
+            or result["requests_per_s"] < before["requests_per_s"] * (1 - tolerance)
+        ):
+            regressions.append(
+                {
+                    "endpoint": result["endpoint"],
+                    "vertices": result["vertices"],
+                    "p95_ms": [before["p95_ms"], result["p95_ms"]],
+                    "requests_per_s": [before["requests_per_s"], result["requests_per_s"]],
+                }
+            )
+    return regressions
+
+
+async def benchmark(args: argparse.Namespace) -> list[dict]:
+    async with AsyncExitStack() as stack:
+        if args.url is None:
+            from src.app import create_app
+
+            app = create_app()
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport, base_url, pid = ASGITransport(app=app), "http://benchmark", os.getpid()
+        else:
+            transport, base_url, pid = None, args.url, args.server_pid
+        client = await stack.enter_async_context(
+            AsyncClient(transport=transport, base_url=base_url, timeout=None)
+        )
+
+        results = []
+        for vertices in args.vertices:
+            results += await benchmark_size(
+                client, vertices, args.requests, args.concurrency, pid, args.duplicate_uploads
+            )
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--vertices", type=int, nargs="+", default=[10, 1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--requests", type=int, default=50, help="Per endpoint and size")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--duplicate-uploads", action="store_true", help="Upload the same bytes on every create"
+    )
+    parser.add_argument("--url", help="Benchmark a running server instead of the app in process")
+    parser.add_argument("--server-pid", type=int, help="Process to read the peak RSS of with --url")
+    parser.add_argument("--baseline", type=Path, help="Results to compare against")
+    parser.add_argument("--save-baseline", type=Path, help="Store the results as a baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline"
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+    report = {"results": results}
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        report["regressions"] = compare(results, baseline, args.tolerance)
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps({"results": results}, indent=2))
+    print(json.dumps(report, indent=2))
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Parse throughput of GeoJsonParser.load against the previous triple parse.
+
+Run with ``python -m benchmarks.geojson_parser``.
+"""
+import argparse
+import json
+import time
+
+import geojson
+
+from benchmarks.synthetic import multipolygon_feature
+from src.parsers import Feature, GeoJsonParser
+
+
+def legacy_load(data: bytes) -> dict:
+    geo_json = geojson.loads(data)
+    feature = Feature(**geo_json)
+    assert geo_json.is_valid
+    return feature.model_dump()
+
+
+def measure(load, data: bytes, vertices: int, min_seconds: float) -> dict:
+    runs, elapsed = 0, 0.0
+    while elapsed < min_seconds or runs < 3:
+        start = time.perf_counter()
+        load(data)
+        elapsed += time.perf_counter() - start
+        runs += 1
+    seconds = elapsed / runs
+    return {
+        "ms": round(seconds * 1000, 3),
+        "mb_per_s": round(len(data) / seconds / 1e6, 1),
+        "vertices_per_s": round(vertices / seconds),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--vertices", type=int, nargs="+", default=[10, 1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    results = []
+    for vertices in args.vertices:
+        data = json.dumps(multipolygon_feature(vertices)).encode()
+        results.append(
+            {
+                "vertices": vertices,
+                "bytes": len(data),
+                "before": measure(legacy_load, data, vertices, args.min_seconds),
+                "after": measure(GeoJsonParser().load, data, vertices, args.min_seconds),
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Serialization cost of a project read, response_model validation vs stored JSON.
+
+"before" replays what FastAPI does for ``response_model=Project``: to_dict,
+pydantic validation of the Feature, jsonable_encoder and json.dumps.
+"after" is Project.to_json, which splices the GeoJSON stored at write time.
+Run with ``python -m benchmarks.project_read``.
+"""
+import argparse
+import json
+import time
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.synthetic import multipolygon_feature
+from src.api import schemas
+from src.models import AreaOfInterest, Project
+
+
+def validated_response(project: Project) -> bytes:
+    content = schemas.Project.model_validate(project.to_dict())
+    return json.dumps(jsonable_encoder(content)).encode()
+
+
+def measure(render, project: Project, min_seconds: float) -> dict:
+    runs, elapsed = 0, 0.0
+    while elapsed < min_seconds or runs < 3:
+        start = time.perf_counter()
+        render(project)
+        elapsed += time.perf_counter() - start
+        runs += 1
+    return {"ms": round(elapsed / runs * 1000, 3)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--vertices", type=int, nargs="+", default=[10, 1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    results = []
+    for vertices in args.vertices:
+        project = Project(
+            id="00000000-0000-0000-0000-000000000000",
+            name="benchmark",
+            description="",
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 12, 31),
+            area_of_interest=AreaOfInterest(
+                geojson_data=multipolygon_feature(vertices)
+            ),
+        )
+        results.append(
+            {
+                "vertices": vertices,
+                "bytes": len(project.to_json()),
+                "before": measure(validated_response, project, args.min_seconds),
+                "after": measure(Project.to_json, project, args.min_seconds),
+            }
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Cold start of a new worker: import, app creation, lifespan startup, first requests.
+
+Every run is a fresh interpreter, like a worker spawned by ``src.main``. It
+reports the time to import ``src.app``, to call ``create_app``, to run the
+lifespan startup (engine, pool warm-up, spatial index, parse workers) against
+the configured database, and the latency of the first and of a later
+``GET /v1/project`` and ``GET /v1/project/{id}``. ``--importtime`` adds the
+slowest modules from ``python -X importtime``.
+
+Run with ``python -m benchmarks.startup``. ``--save-baseline`` stores the
+medians, ``--baseline`` compares against stored medians and exits with 1
+when a phase got slower than ``--tolerance`` allows.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PHASES = ("import_ms", "create_app_ms", "startup_ms", "first_list_ms", "list_ms",
+          "first_get_ms", "get_ms")
+
+
+def _ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _serve(create_app, timings: dict) -> None:
+    from httpx import ASGITransport, AsyncClient
+
+    start = time.perf_counter()
+    app = create_app()
+    timings["create_app_ms"] = _ms(start)
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup_ms"] = _ms(start)
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://startup"
+        ) as client:
+            for name, path in (
+                ("list", "/v1/project"),
+                ("get", "/v1/project/00000000-0000-0000-0000-000000000000"),
+            ):
+                for key in (f"first_{name}_ms", f"{name}_ms"):
+                    start = time.perf_counter()
+                    await client.get(path)
+                    timings[key] = _ms(start)
+
+
+def child() -> None:
+    """One cold start, measured in this fresh interpreter."""
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+    from src.app import create_app
+
+    timings["import_ms"] = _ms(start)
+    asyncio.run(_serve(create_app, timings))
+    print(json.dumps(timings))
+
+
+def run_child(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def slowest_imports(env: dict, count: int) -> list[dict]:
+    """Modules with the largest cumulative import time under ``import src.app``."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app"],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        modules.append(
+            {
+                "module": module.strip(),
+                "self_ms": round(int(self_us) / 1000, 2),
+                "cumulative_ms": round(int(cumulative_us) / 1000, 2),
+            }
+        )
+    modules.sort(key=lambda module: module["cumulative_ms"], reverse=True)
+    return modules[:count]
+
+
+def summarize(runs: list[dict]) -> dict:
+    return {
+        phase: {
+            "median": round(statistics.median(run[phase] for run in runs), 2),
+            "max": max(run[phase] for run in runs),
+        }
+        for phase in PHASES
+    }
+
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Phases whose median is slower than ``tolerance`` allows."""
+    return [
+        {"phase": phase, "median": [baseline[phase]["median"], summary[phase]["median"]]}
+        for phase in PHASES
+        if phase in baseline
+        and summary[phase]["median"] > baseline[phase]["median"] * (1 + tolerance)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--warm-up-connections", type=int, help="Override DATABASE__WARM_UP_CONNECTIONS"
+    )
+    parser.add_argument("--importtime", type=int, default=0, help="Slowest imports to list")
+    parser.add_argument("--baseline", type=Path, help="Results to compare against")
+    parser.add_argument("--save-baseline", type=Path, help="Store the results as a baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    env = dict(os.environ)
+    if args.warm_up_connections is not None:
+        env["DATABASE__WARM_UP_CONNECTIONS"] = str(args.warm_up_connections)
+    summary = summarize([run_child(env) for _ in range(args.runs)])
+    report = {"runs": args.runs, "phases": summary}
+    if args.importtime:
+        report["slowest_imports"] = slowest_imports(env, args.importtime)
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["phases"]
+        report["regressions"] = compare(summary, baseline, args.tolerance)
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps({"phases": summary}, indent=2))
+    print(json.dumps(report, indent=2))
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
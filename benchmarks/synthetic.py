@@ -0,0 +1,22 @@
+import math
+
+
+def multipolygon_feature(vertices: int, polygons: int = 1) -> dict:
+    """A Feature with ``polygons`` closed circular rings holding ``vertices`` points in total."""
+    per_ring = max(vertices // polygons, 4)
+    coordinates = []
+    for index in range(polygons):
+        center_lon, center_lat = -50.0 + index * 0.01, -5.0
+        ring = [
+            [
+                center_lon + 0.004 * math.cos(2 * math.pi * step / (per_ring - 1)),
+                center_lat + 0.004 * math.sin(2 * math.pi * step / (per_ring - 1)),
+            ]
+            for step in range(per_ring - 1)
+        ]
+        ring.append(ring[0])
+        coordinates.append([ring])
+    return {
+        "type": "Feature",
+        "geometry": {"type": "MultiPolygon", "coordinates": coordinates},
+    }
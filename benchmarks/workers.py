@@ -0,0 +1,127 @@
+"""Throughput of the production server by number of worker processes.
+
+For each ``--workers`` count ``python -m src.main`` is started in production
+mode on ``--port``, driven through the endpoint cycle of
+``benchmarks.endpoints`` once all workers completed their startup, and stopped
+with SIGTERM like a deploy would. The report lists every endpoint's
+requests/s and their speedup over the first worker count.
+
+The load comes from a single client process; when the speedup flattens well
+below the core count, check whether the client is saturated first.
+
+Run with ``python -m benchmarks.workers --workers 1 2 4``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+
+from httpx import AsyncClient
+
+from benchmarks.endpoints import benchmark_size
+
+READY = b"Application startup complete"
+
+
+async def start_server(
+    workers: int, port: int
+) -> tuple[asyncio.subprocess.Process, asyncio.Task]:
+    """Start the server, return once every worker is ready to serve.
+
+    The returned task keeps reading the server's log so it never blocks on a
+    full pipe.
+    """
+    env = {
+        **os.environ,
+        "IS_DEBUG": "false",
+        "WEB_PORT": str(port),
+        "SERVER__WORKERS": str(workers),
+        "SERVER__ACCESS_LOG": "false",
+    }
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "src.main", env=env, stderr=asyncio.subprocess.PIPE
+    )
+    ready = 0
+    while ready < workers:
+        line = await process.stderr.readline()
+        if not line:
+            raise RuntimeError(f"The server exited with {await process.wait()}")
+        ready += READY in line
+
+    async def drain() -> None:
+        while await process.stderr.readline():
+            pass
+
+    return process, asyncio.create_task(drain())
+
+
+async def stop_server(process: asyncio.subprocess.Process, log: asyncio.Task) -> int:
+    process.send_signal(signal.SIGTERM)
+    exit_code = await process.wait()
+    await log
+    return exit_code
+
+
+async def benchmark(args: argparse.Namespace) -> list[dict]:
+    results = []
+    for workers in args.workers:
+        process, log = await start_server(workers, args.port)
+        try:
+            async with AsyncClient(
+                base_url=f"http://127.0.0.1:{args.port}", timeout=None
+            ) as client:
+                for vertices in args.vertices:
+                    for result in await benchmark_size(
+                        client, vertices, args.requests, args.concurrency, None
+                    ):
+                        del result["peak_rss_mb"]
+                        results.append({"workers": workers, **result})
+        finally:
+            exit_code = await stop_server(process, log)
+        # uvicorn re-raises the signal once the graceful shutdown completed.
+        if exit_code not in (0, -signal.SIGTERM):
+            raise RuntimeError(f"The server did not shut down cleanly: {exit_code}")
+    return results
+
+
+def speedups(results: list[dict]) -> list[dict]:
+    """requests/s of each endpoint relative to the first worker count."""
+    first: dict[tuple[str, int], float] = {}
+    rows = []
+    for result in results:
+        key = (result["endpoint"], result["vertices"])
+        first.setdefault(key, result["requests_per_s"])
+        rows.append(
+            {
+                "workers": result["workers"],
+                "endpoint": result["endpoint"],
+                "vertices": result["vertices"],
+                "requests_per_s": result["requests_per_s"],
+                "speedup": round(result["requests_per_s"] / first[key], 2),
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--vertices", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--requests", type=int, default=200, help="Per endpoint and size")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+    print(
+        json.dumps(
+            {"cpu_count": os.cpu_count(), "speedups": speedups(results), "results": results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,123 @@
+import math
 from typing import AsyncGenerator
 
-from fastapi import Depends
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
-from src.infrastucture import db
+from src.cache import ProjectCache
+from src.config import get_settings
+from src.infrastucture.db import Database
+from src.metrics import Metrics
+from src.parse_pool import ParsePool
 from src.parsers import GeoJsonParser
 from src.repositories import ProjectRepository
-from src.services import ProjectService
+from src.services import ProjectExporter, ProjectService
+from src.spatial_index import SpatialIndex
 
 
-async def get_session() -> AsyncGenerator[db.AsyncSession, None]:
-    async with db.async_session() as session:
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+PRIMARY_COOKIE = "read_primary"
+PRIMARY_HEADER = "x-read-primary"
+
+
+def get_database(request: Request) -> Database:
+    return request.app.state.database
+
+
+def get_session_factory(
+    request: Request,
+    response: Response,
+    database: Database = Depends(get_database),
+) -> async_sessionmaker[AsyncSession]:
+    """Replica sessions for reads, primary sessions for writes.
+
+    A write sets a cookie that keeps the client reading from the primary
+    until the replica has caught up, so it sees its own writes. Clients that
+    do not keep cookies can send the X-Read-Primary header instead.
+    """
+    replica = get_settings().replica
+    if database.replica_session is None or replica is None:
+        return database.async_session
+    if request.method not in READ_METHODS:
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            "1",
+            max_age=math.ceil(replica.max_lag_seconds),
+            httponly=True,
+            samesite="lax",
+        )
+        return database.async_session
+    if PRIMARY_COOKIE in request.cookies or request.headers.get(PRIMARY_HEADER):
+        return database.async_session
+    return database.replica_session
+
+
+async def get_session(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> AsyncGenerator[AsyncSession, None]:
+    async with session_factory() as session:
         yield session
 
 
-def project_service(session: AsyncSession = Depends(get_session)) -> ProjectService:
+def get_engine(database: Database = Depends(get_database)) -> AsyncEngine:
+    return database.engine
+
+
+def get_spatial_index(request: Request) -> SpatialIndex:
+    return request.app.state.spatial_index
+
+
+def get_project_cache(request: Request) -> ProjectCache | None:
+    return request.app.state.project_cache
+
+
+def get_metrics(request: Request) -> Metrics | None:
+    return request.app.state.metrics
+
+
+def get_parse_pool(request: Request) -> ParsePool | None:
+    return request.app.state.parse_pool
+
+
+def get_geojson_parser(request: Request) -> GeoJsonParser:
+    return request.app.state.geojson_parser
+
+
+def project_service(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    spatial_index: SpatialIndex = Depends(get_spatial_index),
+    cache: ProjectCache | None = Depends(get_project_cache),
+    parse_pool: ParsePool | None = Depends(get_parse_pool),
+    geojson_parser: GeoJsonParser = Depends(get_geojson_parser),
+    database: Database = Depends(get_database),
+) -> ProjectService:
+    settings = get_settings()
+    replica = (
+        session_factory is database.replica_session and settings.replica is not None
+    )
+    # A read pinned to the primary must see the client's own writes, while a
+    # lagging replica read may have cached the previous version after the
+    # write cleared it. Such reads bypass the shared cache.
+    pinned = (
+        settings.replica is not None
+        and database.replica_session is not None
+        and not replica
+        and request.method in READ_METHODS
+    )
     return ProjectService(
-        project_repository=ProjectRepository(session), geojson_parser=GeoJsonParser()
+        project_repository=ProjectRepository(session),
+        geojson_parser=geojson_parser,
+        spatial_index=spatial_index,
+        cache=None if pinned else cache,
+        cache_ttl=settings.replica.max_lag_seconds if replica else None,
+        parse_pool=parse_pool,
     )
+
+
+def project_exporter(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> ProjectExporter:
+    return ProjectExporter(session_factory)
@@ -0,0 +1,40 @@
+"""Endpoint descriptions kept as markdown in ``api_docs/``.
+
+They are read when the OpenAPI schema is first requested rather than when the
+routes are defined, so importing the app reads no files and does not depend
+on the working directory.
+"""
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+API_DOCS = Path(__file__).resolve().parents[2] / "api_docs"
+
+Endpoint = TypeVar("Endpoint", bound=Callable)
+
+
+def api_doc(filename: str) -> Callable[[Endpoint], Endpoint]:
+    """Describe the decorated endpoint by ``api_docs/<filename>``."""
+
+    def describe(endpoint: Endpoint) -> Endpoint:
+        endpoint.api_doc = filename
+        return endpoint
+
+    return describe
+
+
+def lazy_openapi(app: FastAPI) -> Callable[[], dict]:
+    """``app.openapi`` that loads the endpoint descriptions with the first schema."""
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            for route in app.routes:
+                filename = getattr(getattr(route, "endpoint", None), "api_doc", None)
+                if isinstance(route, APIRoute) and filename is not None:
+                    # Trimmed like FastAPI trims descriptions given to the route.
+                    route.description = (API_DOCS / filename).read_text().split("\f")[0].strip()
+        return FastAPI.openapi(app)
+
+    return openapi
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.api.deps import get_engine, get_metrics, get_project_cache
+from src.cache import ProjectCache
+from src.metrics import Metrics
+
+router = APIRouter()
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    cache: ProjectCache | None = Depends(get_project_cache),
+) -> dict:
+    if cache is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "entries": len(cache.local),
+        "size_bytes": cache.local.size,
+        "max_bytes": cache.local.max_bytes,
+        **cache.stats.as_dict(),
+    }
+
+
+@router.get("/db/pool/stats")
+async def get_pool_stats(engine: AsyncEngine = Depends(get_engine)) -> dict:
+    pool = engine.pool
+    if not hasattr(pool, "as_dict"):
+        return {"pool": type(pool).__name__}
+    return {"pool": type(pool).__name__, **pool.as_dict()}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics_text(
+    metrics: Metrics | None = Depends(get_metrics),
+) -> PlainTextResponse:
+    """Request counters and latency histograms in the Prometheus text format."""
+    if metrics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled."
+        )
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
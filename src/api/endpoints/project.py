@@ -1,17 +1,35 @@
-from pathlib import Path
-from typing import Annotated, Generic, Type, TypeVar
+from datetime import date
+from typing import Annotated, Any, AsyncIterator, Generic, Type, TypeVar
 
 from fastapi import (APIRouter, Depends, File, Form, HTTPException, Query,
-                     UploadFile, status)
+                     Request, Response, UploadFile, status)
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, ValidationError
 
-from src.api.deps import project_service
-from src.api.schemas import Project, ProjectCreate, ProjectList, ProjectUpdate
-from src.exceptions import GeoJSONParseException, ProjectDoesNotExists
-from src.services import ProjectService
+from src.api.deps import project_exporter, project_service
+from src.api.docs import api_doc
+from src.api.uploads import (GEOJSON_CONTENT_TYPES, NDJSON_CONTENT_TYPES,
+                             UploadRoute, check_content_length, read_lines,
+                             read_request_body, read_upload_file)
+from src.api.responses import (RawJSONResponse, conditional_json_response,
+                               project_list_response, raw_json_response)
+from src.api.schemas import (Project, ProjectContains, ProjectCreate,
+                             ProjectImport, ProjectList, ProjectSummary,
+                             ProjectUpdate)
+from src.config import get_settings
+from src.exceptions import (GeoJSONParseException, InvalidCursor,
+                            ParseTimeout, ProjectDoesNotExists, UploadTooLarge)
+from src.geometry import BoundingBox
+from src.metrics import timed
+from src.models import PROJECT_FIELDS, SORT_FIELDS
+from src.parsers import CONTENT_ERROR, decode_json
+from src.repositories import ActiveRange
+from src.services import (CountMode, ExportFormat, ImportItem,
+                          ProjectExporter, ProjectService)
+from src.simplify import select_level
 
-router = APIRouter()
+router = APIRouter(route_class=UploadRoute)
 
 
 T = TypeVar("T", bound=BaseModel)
@@ -34,6 +52,10 @@ class FormAsJson(Generic[T]):
             ],
         ),
     ) -> T:
+        return self.validate(data)
+
+    @timed("validate")
+    def validate(self, data: str) -> T:
         try:
             return self.class_.model_validate_json(data)
         except ValidationError as e:
@@ -43,26 +65,256 @@ class FormAsJson(Generic[T]):
             )
 
 
-async def process_area_of_interest(area_of_interest: File) -> bytes:
-        if area_of_interest.content_type != "application/json":
+class QueryAsJson(FormAsJson[T]):
+    def __call__(
+        self,
+        data: str = Query(
+            ...,
+            description="JSON containing project data",
+            examples=[
+                {
+                    "name": "name",
+                    "date_range": {"start": "2024-12-10", "end": "2024-12-11"},
+                }
+            ],
+        ),
+    ) -> T:
+        return self.validate(data)
+
+
+def parse_bbox(
+    bbox: str | None = Query(
+        None,
+        description="Viewport `minx,miny,maxx,maxy`, returns projects whose area of interest touches it",
+        examples=["-53.0,-6.0,-52.0,-5.0"],
+    ),
+) -> BoundingBox | None:
+    if bbox is None:
+        return None
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid bbox. Expected four comma separated numbers: minx,miny,maxx,maxy.",
+        )
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid bbox. Minimum values cannot be greater than maximum values.",
+        )
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def parse_active(
+    active_from: date | None = Query(
+        None, description="Only projects whose date range includes a day on or after this date"
+    ),
+    active_to: date | None = Query(
+        None, description="Only projects whose date range includes a day on or before this date"
+    ),
+) -> ActiveRange | None:
+    if active_from is None and active_to is None:
+        return None
+    if active_from is not None and active_to is not None and active_from > active_to:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid active range. active_from cannot be later than active_to.",
+        )
+    return active_from, active_to
+
+
+def parse_level(
+    zoom: int | None = Query(
+        None,
+        ge=0,
+        le=24,
+        description="Web map zoom level, returns the area of interest simplified for it",
+    ),
+    simplify: float | None = Query(
+        None,
+        gt=0,
+        description="Simplification tolerance in degrees, takes precedence over `zoom`",
+    ),
+) -> int | None:
+    return select_level(zoom, simplify)
+
+
+def parse_fields(
+    fields: str | None = Query(
+        None,
+        description="Comma separated fields to return, `id` is always included. "
+        "The area of interest is only read when `area_of_interest` is requested.",
+        examples=["name,date_range"],
+    ),
+) -> tuple[str, ...] | None:
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - PROJECT_FIELDS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid fields: {', '.join(sorted(unknown))}. "
+            f"Expected any of: {', '.join(PROJECT_FIELDS)}.",
+        )
+    return tuple(sorted(requested | {"id"}))
+
+
+def representation(level: int | None, fields: tuple[str, ...] | None) -> str:
+    """ETag variant of a project document simplified to ``level`` with ``fields``."""
+    parts = []
+    if level is not None:
+        parts.append(f"z{level}")
+    if fields is not None:
+        # Not a comma, If-None-Match is a comma separated list of ETags.
+        parts.append(".".join(fields))
+    return "-".join(parts)
+
+
+def geojson_parse_error(ex: GeoJSONParseException) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=[
+            {
+                "type": "geojson_parsing",
+                "msg": ex.message,
+                "ctx": {"error": ex.errors},
+            }
+        ],
+    )
+
+
+def upload_too_large(ex: UploadTooLarge) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(ex)
+    )
+
+
+def parse_timeout(ex: ParseTimeout) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(ex))
+
+
+@timed("upload")
+async def process_area_of_interest(area_of_interest: File) -> bytearray:
+        if area_of_interest.content_type not in GEOJSON_CONTENT_TYPES:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid file type. Only JSON files are allowed.",
             )
-        geojson_data = await area_of_interest.read()
-        return geojson_data
+        upload_settings = get_settings().upload
+        try:
+            return await read_upload_file(
+                area_of_interest, upload_settings.max_bytes, upload_settings.chunk_size
+            )
+        except UploadTooLarge as ex:
+            raise upload_too_large(ex)
+
+
+@timed("upload")
+async def process_geojson_body(request: Request) -> bytearray:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in GEOJSON_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Invalid content type. Only application/geo+json bodies are allowed.",
+        )
+    try:
+        return await read_request_body(request, get_settings().upload.max_bytes)
+    except UploadTooLarge as ex:
+        raise upload_too_large(ex)
+
+
+GEOJSON_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/geo+json": {"schema": {"type": "object"}}},
+    }
+}
+
+IMPORT_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/geo+json": {"schema": {"type": "object"}},
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+
+async def import_documents(request: Request) -> AsyncIterator[Any]:
+    """Features of an import body, or the error of a line that is not valid JSON."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    upload_settings = get_settings().upload
+    max_bytes = upload_settings.import_max_bytes
+    check_content_length(request, max_bytes)
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        # Each line is one feature, held to the limit of a single upload.
+        lines = read_lines(request.stream(), max_bytes, upload_settings.max_bytes)
+        async for line in lines:
+            if line.strip():
+                try:
+                    yield decode_json(line)
+                except GeoJSONParseException as ex:
+                    yield ex
+        return
+
+    if content_type not in GEOJSON_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Invalid content type. Only GeoJSON FeatureCollection or NDJSON bodies are allowed.",
+        )
+    # Buffered and decoded as a whole, hence its lower limit.
+    collection = decode_json(
+        await read_request_body(request, upload_settings.import_collection_max_bytes)
+    )
+    if (
+        not isinstance(collection, dict)
+        or collection.get("type") != "FeatureCollection"
+        or not isinstance(collection.get("features"), list)
+    ):
+        raise GeoJSONParseException(
+            CONTENT_ERROR, ["The body must be a FeatureCollection with a features array"]
+        )
+    for feature in collection["features"]:
+        yield feature
+
+
+def import_item(document: Any) -> ImportItem:
+    properties = document.get("properties") if isinstance(document, dict) else None
+    data = ProjectCreate.model_validate(properties or {})
+    return ImportItem(
+        data.name, data.description, data.date_range.start, data.date_range.end, document
+    )
+
+
+def import_error(error: Exception) -> list:
+    if isinstance(error, ValidationError):
+        return jsonable_encoder(error.errors(include_url=False))
+    if isinstance(error, GeoJSONParseException):
+        return geojson_parse_error(error).detail
+    return [{"type": "database", "msg": str(getattr(error, "orig", error))}]
+
+
+def import_summary(results: list[dict]) -> dict:
+    results.sort(key=lambda result: result["index"])
+    created = sum(1 for result in results if "id" in result)
+    return {"created": created, "failed": len(results) - created, "results": results}
 
 
 @router.post(
     "/project",
-    description=Path("api_docs/create_project.md").read_text(),
     response_model=Project,
 )
+@api_doc("create_project.md")
 async def create_project(
     area_of_interest: UploadFile,
+    response: Response,
     data: ProjectCreate = Depends(FormAsJson(ProjectCreate)),
     project_service: ProjectService = Depends(project_service),
-) -> dict:
+) -> RawJSONResponse:
     geojson_data = await process_area_of_interest(area_of_interest)
 
     try:
@@ -73,31 +325,25 @@ async def create_project(
             end_date=data.date_range.end,
             geojson_bytes=geojson_data,
         )
-        return project
+        return raw_json_response(project, response)
     except GeoJSONParseException as ex:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=[
-                {
-                    "type": "geojson_parsing",
-                    "msg": ex.message,
-                    "ctx": {"error": ex.errors},
-                }
-            ],
-        )
+        raise geojson_parse_error(ex)
+    except ParseTimeout as ex:
+        raise parse_timeout(ex)
 
 
 @router.patch(
     "/project/{project_id}",
-    description=Path("api_docs/update_project.md").read_text(),
     response_model=Project,
 )
+@api_doc("update_project.md")
 async def update_project(
     project_id: str,
+    response: Response,
     area_of_interest: UploadFile | None | str = None,
     data: ProjectUpdate = Depends(FormAsJson(ProjectUpdate)),
     project_service: ProjectService = Depends(project_service),
-) -> dict:
+) -> RawJSONResponse:
     if area_of_interest:
         try:
             geojson_data = await process_area_of_interest(area_of_interest)
@@ -115,30 +361,172 @@ async def update_project(
             end_date=data.date_range.end if data.date_range else None,
             geojson_bytes=geojson_data,
         )
-        return project
+        return raw_json_response(project.body, response)
     except ProjectDoesNotExists:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     except GeoJSONParseException as ex:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=[
-                {
-                    "type": "geojson_parsing",
-                    "msg": ex.message,
-                    "ctx": {"error": ex.errors},
-                }
-            ],
+        raise geojson_parse_error(ex)
+    except ParseTimeout as ex:
+        raise parse_timeout(ex)
+
+
+@router.post(
+    "/project/geojson",
+    description="Create a project from a raw `application/geo+json` Feature body, "
+    "project data is passed as JSON in the `data` query parameter.",
+    response_model=Project,
+    openapi_extra=GEOJSON_BODY,
+)
+async def create_project_from_geojson(
+    response: Response,
+    geojson_data: bytes = Depends(process_geojson_body),
+    data: ProjectCreate = Depends(QueryAsJson(ProjectCreate)),
+    project_service: ProjectService = Depends(project_service),
+) -> RawJSONResponse:
+    try:
+        project = await project_service.create(
+            name=data.name,
+            description=data.description,
+            start_date=data.date_range.start,
+            end_date=data.date_range.end,
+            geojson_bytes=geojson_data,
         )
+        return raw_json_response(project, response)
+    except GeoJSONParseException as ex:
+        raise geojson_parse_error(ex)
+    except ParseTimeout as ex:
+        raise parse_timeout(ex)
 
 
-@router.get("/project/{project_id}", response_model=Project)
-async def get_project(
+@router.post(
+    "/project/import",
+    response_model=ProjectImport,
+    response_model_exclude_none=True,
+    openapi_extra=IMPORT_BODY,
+)
+@api_doc("import_projects.md")
+async def import_projects(
+    request: Request,
+    project_service: ProjectService = Depends(project_service),
+) -> dict:
+    batch_size = get_settings().upload.import_batch_size
+    results: list[dict] = []
+    batch: list[tuple[int, ImportItem]] = []
+
+    async def flush() -> None:
+        outcomes = await project_service.import_projects([item for _, item in batch])
+        for (index, _), outcome in zip(batch, outcomes):
+            if isinstance(outcome, str):
+                results.append({"index": index, "id": outcome})
+            else:
+                results.append({"index": index, "errors": import_error(outcome)})
+        batch.clear()
+
+    try:
+        index = 0
+        async for document in import_documents(request):
+            try:
+                if isinstance(document, GeoJSONParseException):
+                    raise document
+                batch.append((index, import_item(document)))
+            except (GeoJSONParseException, ValidationError) as ex:
+                results.append({"index": index, "errors": import_error(ex)})
+            index += 1
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
+    except UploadTooLarge as ex:
+        # Batches committed before the limit was reached stay imported, the
+        # client needs their ids to resume without creating duplicates.
+        return JSONResponse(
+            {"detail": str(ex), **import_summary(results)},
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+    except GeoJSONParseException as ex:
+        raise geojson_parse_error(ex)
+
+    return import_summary(results)
+
+
+@router.put(
+    "/project/{project_id}/area_of_interest",
+    description="Replace the area of interest with a raw `application/geo+json` Feature body.",
+    response_model=Project,
+    openapi_extra=GEOJSON_BODY,
+)
+async def replace_area_of_interest(
     project_id: str,
+    response: Response,
+    geojson_data: bytes = Depends(process_geojson_body),
+    project_service: ProjectService = Depends(project_service),
+) -> RawJSONResponse:
+    try:
+        project = await project_service.update(
+            project_id=project_id,
+            name=None,
+            description=None,
+            start_date=None,
+            end_date=None,
+            geojson_bytes=geojson_data,
+        )
+        return raw_json_response(project.body, response)
+    except ProjectDoesNotExists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    except GeoJSONParseException as ex:
+        raise geojson_parse_error(ex)
+    except ParseTimeout as ex:
+        raise parse_timeout(ex)
+
+
+@router.get("/project/contains", response_model=ProjectContains)
+async def get_projects_containing(
+    lon: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90),
     project_service: ProjectService = Depends(project_service),
 ) -> dict:
+    return {"project_ids": project_service.contains(lon, lat)}
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "geojson": "application/geo+json"}
+
+
+@router.get(
+    "/project/export",
+    description="Stream every project as GeoJSON Features carrying the project in "
+    "`properties`, either one per line (`ndjson`) or as a single `FeatureCollection` "
+    "(`geojson`). The `ndjson` output is accepted by `POST /v1/project/import`.",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}
+    },
+)
+async def export_projects(
+    format: ExportFormat = Query("ndjson"),
+    project_exporter: ProjectExporter = Depends(project_exporter),
+) -> StreamingResponse:
+    return StreamingResponse(
+        project_exporter.stream(format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="projects.{format}"'
+        },
+    )
+
+
+@router.get("/project/{project_id}", response_model=Project | ProjectSummary)
+async def get_project(
+    project_id: str,
+    request: Request,
+    level: int | None = Depends(parse_level),
+    fields: tuple[str, ...] | None = Depends(parse_fields),
+    project_service: ProjectService = Depends(project_service),
+) -> Response:
     try:
-        project = await project_service.get(project_id)
-        return project
+        project = await project_service.get(project_id, level, fields)
+        return conditional_json_response(
+            request, project.body, project.modified, representation(level, fields)
+        )
     except ProjectDoesNotExists:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
@@ -157,8 +545,59 @@ async def delete_project(
 @router.get("/project", response_model=ProjectList)
 async def get_projects(
     page: int = Query(1, ge=1),
-    page_size: int = Query(10, le=50),
+    page_size: int = Query(10, ge=1, le=50),
+    cursor: str | None = Query(
+        None, description="Opaque `next_cursor` from a previous page, takes precedence over `page`"
+    ),
+    bbox: BoundingBox | None = Depends(parse_bbox),
+    level: int | None = Depends(parse_level),
+    fields: tuple[str, ...] | None = Depends(parse_fields),
+    active: ActiveRange | None = Depends(parse_active),
+    q: str | None = Query(
+        None,
+        min_length=1,
+        max_length=200,
+        description="Only projects whose name or description match these words. "
+        'Supports "quoted phrases", `or` and `-excluded` words',
+    ),
+    sort: str | None = Query(
+        None,
+        pattern=rf"^(-?({'|'.join(SORT_FIELDS)})|rank)$",
+        description=f"One of {', '.join(SORT_FIELDS)}, prefixed with `-` for descending "
+        "order, or `rank` for the best `q` matches first. Defaults to `rank` with `q` "
+        "and to `created` otherwise",
+    ),
+    count: CountMode | None = Query(
+        None,
+        description="Adds `total`. `exact` is cached until the next write, `estimated` "
+        "comes from table statistics and is only used without `bbox`",
+    ),
     project_service: ProjectService = Depends(project_service),
-) -> dict:
-    projects, has_next_page = await project_service.list(page, page_size)
-    return {"results": projects, "elements": len(projects), "has_next_page": has_next_page, "page_size": page_size, "page": page}
+) -> RawJSONResponse:
+    if sort is None:
+        sort = "created" if q is None else "rank"
+    elif sort == "rank" and q is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid sort. rank requires q.",
+        )
+    try:
+        projects, has_next_page, next_cursor = await project_service.list(
+            page, page_size, cursor, bbox, level, fields, active, sort, q
+        )
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+    total = (
+        await project_service.count(count, bbox, active, q) if count is not None else None
+    )
+    return project_list_response(
+        projects,
+        elements=len(projects),
+        has_next_page=has_next_page,
+        page_size=page_size,
+        page=page,
+        next_cursor=next_cursor,
+        total=total,
+    )
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+from src.metrics import timed
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class RawJSONResponse(Response):
+    """Response for bodies that are already serialized JSON.
+
+    Returning it from an endpoint skips response_model validation and
+    jsonable_encoder, the declared response_model only documents the schema.
+    """
+
+    media_type = "application/json"
+
+
+def raw_json_response(body: bytes, response: Response) -> RawJSONResponse:
+    """RawJSONResponse carrying the headers set on the endpoint's injected ``response``.
+
+    FastAPI drops those, e.g. the read_primary cookie of a write, when the
+    endpoint returns a response of its own.
+    """
+    raw = RawJSONResponse(body)
+    raw.headers.raw.extend(response.headers.raw)
+    return raw
+
+
+@timed("encode")
+def project_list_response(projects: list[bytes], **fields) -> RawJSONResponse:
+    tail = json.dumps(fields, separators=(",", ":")).encode()
+    body = b'{"results":[' + b",".join(projects) + b"]"
+    return RawJSONResponse(body + (b"," + tail[1:] if fields else b"}"))
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def _not_modified_since(if_modified_since: str, modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified.replace(microsecond=0) <= since
+
+
+def conditional_json_response(
+    request: Request, body: bytes, modified: datetime, variant: str = ""
+) -> Response:
+    """JSON response carrying ETag/Last-Modified derived from ``modified``, or a 304.
+
+    ``variant`` tells apart the representations of one version, e.g. its zoom
+    levels and sparse fieldsets, each of which gets its own ETag.
+    """
+    microseconds = (modified.replace(tzinfo=None) - EPOCH) // timedelta(microseconds=1)
+    modified = modified.replace(tzinfo=modified.tzinfo or timezone.utc)
+    etag = f"{microseconds:x}-{variant}" if variant else f"{microseconds:x}"
+    headers = {
+        "ETag": f'"{etag}"',
+        "Last-Modified": format_datetime(modified.astimezone(timezone.utc), usegmt=True),
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        not_modified = if_modified_since is not None and _not_modified_since(
+            if_modified_since, modified
+        )
+
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return RawJSONResponse(body, headers=headers)
@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Annotated
+from typing import Annotated, Any
 
 from pydantic import BaseModel, Field, ValidationInfo, field_validator
 
@@ -34,9 +34,37 @@ class Project(ProjectCreate):
     area_of_interest: Feature
 
 
+class ProjectSummary(BaseModel):
+    """Sparse fieldset of a project, only ``id`` is always present."""
+
+    id: str
+    name: str | None = None
+    description: str | None = None
+    date_range: DateRange | None = None
+    area_of_interest: Feature | None = None
+
+
 class ProjectList(BaseModel):
-    results: list[Project]
+    results: list[Project | ProjectSummary]
     has_next_page: bool
     elements: int
     page_size: int
     page: int
+    next_cursor: str | None = None
+    total: int | None = None
+
+
+class ProjectContains(BaseModel):
+    project_ids: list[str]
+
+
+class ProjectImportResult(BaseModel):
+    index: int
+    id: str | None = None
+    errors: list[Any] | None = None
+
+
+class ProjectImport(BaseModel):
+    created: int
+    failed: int
+    results: list[ProjectImportResult]
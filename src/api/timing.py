@@ -0,0 +1,143 @@
+import functools
+import inspect
+import logging
+import time
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import ProfilerSettings
+from src.infrastucture.profiler import QueryProfile, profile_queries
+from src.metrics import (Metrics, current_timings, start_timings, stop_timings,
+                         timed)
+
+logger = logging.getLogger(__name__)
+
+
+class TimingMiddleware:
+    """Times every HTTP request and records it in ``metrics`` by route.
+
+    The phases measured so far are reported in a Server-Timing header when the
+    response starts, the metrics get the phases of the complete request.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics, server_timing: bool = True) -> None:
+        self.app = app
+        self.metrics = metrics
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_timings()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", timings.server_timing(time.perf_counter() - start)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_timings(token)
+            route = scope.get("route")
+            self.metrics.observe(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                time.perf_counter() - start,
+                timings.phases,
+            )
+
+
+class QueryProfilerMiddleware:
+    """Profiles the SQL of every HTTP request and logs what looks wrong.
+
+    Slow statements are logged as they finish. A request over the query
+    budget or repeating one statement shape, the usual sign of an N+1 loop,
+    is logged with its slowest statements when it ends.
+    """
+
+    def __init__(self, app: ASGIApp, settings: ProfilerSettings) -> None:
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries(
+            self.settings.slowest, self.settings.slow_query_ms / 1000
+        ) as profile:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.report(f"{scope['method']} {scope['path']}", profile)
+
+    def report(self, request: str, profile: QueryProfile) -> None:
+        if profile.count > self.settings.query_budget:
+            logger.warning(
+                "%s ran %d statements, over the budget of %d: %s",
+                request,
+                profile.count,
+                self.settings.query_budget,
+                profile.as_dict(),
+            )
+        for shape, count in profile.repeated(self.settings.repeated_statements):
+            logger.warning("%s ran the same statement %d times, N+1? %s", request, count, shape)
+        logger.debug("%s SQL profile: %s", request, profile.as_dict())
+
+
+class TimedRequest(Request):
+    async def _get_form(self, **kwargs):
+        with timed("multipart"):
+            return await super()._get_form(**kwargs)
+
+
+def _mark_return(endpoint: Callable) -> Callable:
+    @functools.wraps(endpoint)
+    async def marked_endpoint(*args, **kwargs):
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings = current_timings()
+            if timings is not None:
+                timings.endpoint_returned = time.perf_counter()
+
+    return marked_endpoint
+
+
+class TimedRoute(APIRoute):
+    """Route that times the ``multipart`` form parsing and the ``encode`` phase.
+
+    ``encode`` starts when the endpoint returns. For endpoints returning data
+    it is the response_model validation and serialization done by FastAPI.
+    """
+
+    def get_route_handler(self) -> Callable:
+        if inspect.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = _mark_return(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            response = await handler(TimedRequest(request.scope, request.receive))
+            timings = current_timings()
+            if timings is not None and timings.endpoint_returned is not None:
+                timings.add("encode", time.perf_counter() - timings.endpoint_returned)
+            return response
+
+        return timed_handler
@@ -0,0 +1,108 @@
+from typing import AsyncIterator, Callable
+
+from fastapi import Request, Response, UploadFile, status
+from fastapi.responses import JSONResponse
+
+from src.api.timing import TimedRoute
+from src.config import get_settings
+from src.exceptions import UploadTooLarge
+
+GEOJSON_CONTENT_TYPES = ("application/json", "application/geo+json")
+NDJSON_CONTENT_TYPES = (
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/geo+json-seq",
+)
+# Room for the form fields next to the file and the multipart framing,
+# Starlette limits every field that is not a file to 1 MiB.
+FORM_OVERHEAD_BYTES = 1024 * 1024
+
+
+async def read_limited(chunks: AsyncIterator[bytes], max_bytes: int) -> bytearray:
+    """Collect a byte stream, giving up as soon as it grows past ``max_bytes``.
+
+    The buffer is returned as is, copying it to ``bytes`` would double the
+    memory of the largest uploads.
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            raise UploadTooLarge(max_bytes)
+    return buffer
+
+
+async def read_lines(
+    chunks: AsyncIterator[bytes], max_bytes: int, max_line_bytes: int
+) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines as it arrives, so only one line is buffered.
+
+    Gives up when the stream grows past ``max_bytes`` or a line past
+    ``max_line_bytes``.
+    """
+    buffer = bytearray()
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        buffer += chunk
+        if b"\n" in chunk:
+            *lines, rest = buffer.split(b"\n")
+            buffer = bytearray(rest)
+            for line in lines:
+                if len(line) > max_line_bytes:
+                    raise UploadTooLarge(max_line_bytes)
+                yield bytes(line)
+        if len(buffer) > max_line_bytes:
+            raise UploadTooLarge(max_line_bytes)
+    if buffer:
+        yield bytes(buffer)
+
+
+def check_content_length(request: Request, max_bytes: int) -> None:
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+
+async def _file_chunks(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+async def read_upload_file(file: UploadFile, max_bytes: int, chunk_size: int) -> bytearray:
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+    return await read_limited(_file_chunks(file, chunk_size), max_bytes)
+
+
+async def read_request_body(request: Request, max_bytes: int) -> bytearray:
+    check_content_length(request, max_bytes)
+    return await read_limited(request.stream(), max_bytes)
+
+
+class UploadRoute(TimedRoute):
+    """Route refusing a multipart body larger than an upload by its
+    Content-Length, before the form is parsed and its files are spooled.
+
+    FastAPI parses the form before it solves any dependency, so a
+    dependency would only see the upload once it was received completely.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            if request.headers.get("content-type", "").startswith("multipart/form-data"):
+                max_bytes = get_settings().upload.max_bytes
+                try:
+                    check_content_length(request, max_bytes + FORM_OVERHEAD_BYTES)
+                except UploadTooLarge:
+                    return JSONResponse(
+                        {"detail": str(UploadTooLarge(max_bytes))},
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    )
+            return await handler(request)
+
+        return limited_handler
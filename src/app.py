@@ -1,9 +1,116 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
-from src.api.endpoints import project
+from src.api.docs import lazy_openapi
+from src.api.endpoints import monitoring, project
+from src.api.timing import QueryProfilerMiddleware, TimingMiddleware
+from src.cache import build_project_cache
+from src.config import get_settings
+from src.infrastucture.db import Database
+from src.infrastucture.profiler import install_profiler
+from src.metrics import Metrics
+from src.parse_pool import build_parse_pool
+from src.parsers import GeoJsonParser
+from src.repositories import ProjectRepository
+from src.spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+
+async def load_spatial_index(
+    database: Database, spatial_index: SpatialIndex, in_thread: bool = False
+) -> None:
+    async with database.async_session() as session:
+        geometries = await ProjectRepository(session).list_geometries()
+    if in_thread:
+        await asyncio.to_thread(spatial_index.bulk_load, geometries)
+    else:
+        spatial_index.bulk_load(geometries)
+
+
+async def reload_spatial_index(
+    database: Database, spatial_index: SpatialIndex, interval: float
+) -> None:
+    """Reload the index every ``interval`` seconds, picking up the projects
+    created, changed and deleted through the other workers.
+
+    The reloaded index is built in a thread and swapped in at once, the
+    changes this worker made in the meantime are replayed on it.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        spatial_index.start_reload()
+        reloaded = SpatialIndex(spatial_index.rebuild_threshold)
+        try:
+            await load_spatial_index(database, reloaded, in_thread=True)
+        except Exception:
+            logger.exception("Reloading the spatial index failed")
+            spatial_index.finish_reload(None)
+        else:
+            spatial_index.finish_reload(reloaded)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Creates the resources of the worker and warms them up before it serves.
+
+    The pool connections are opened with the hot statements prepared, the
+    spatial index is loaded and the parse workers are started, so the first
+    requests of a new worker are as fast as the later ones.
+    """
+    settings = get_settings()
+    database = app.state.database = Database(settings.database, settings.replica)
+    if settings.profiler.enabled:
+        for engine in database.engines:
+            install_profiler(engine)
+    app.state.geojson_parser = GeoJsonParser(max_vertices=settings.upload.max_vertices)
+    app.state.project_cache = build_project_cache(settings.cache)
+    app.state.spatial_index = SpatialIndex()
+    parse_pool = app.state.parse_pool = build_parse_pool(settings.upload)
+    reloader = None
+
+    try:
+        await database.warm_up(lambda session: ProjectRepository(session).warm_up())
+        await load_spatial_index(database, app.state.spatial_index)
+        if settings.spatial_index.reload_seconds is not None:
+            reloader = asyncio.create_task(
+                reload_spatial_index(
+                    database, app.state.spatial_index, settings.spatial_index.reload_seconds
+                )
+            )
+
+        if parse_pool is not None:
+            parse_pool.start()
+            await parse_pool.warm_up("src.services")
+        yield
+    finally:
+        if reloader is not None:
+            reloader.cancel()
+            with suppress(asyncio.CancelledError):
+                await reloader
+        if parse_pool is not None:
+            await parse_pool.shutdown()
+        await database.dispose()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI()
+    settings = get_settings()
+    app = FastAPI(lifespan=lifespan)
+    app.openapi = lazy_openapi(app)
+    app.state.metrics = None
+    if settings.metrics.enabled:
+        app.state.metrics = Metrics()
+        app.add_middleware(
+            TimingMiddleware,
+            metrics=app.state.metrics,
+            server_timing=settings.metrics.server_timing,
+        )
+    if settings.profiler.enabled:
+        app.add_middleware(QueryProfilerMiddleware, settings=settings.profiler)
     app.include_router(project.router, prefix="/v1", tags=["project"])
+    app.include_router(monitoring.router, tags=["monitoring"])
     return app
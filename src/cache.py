@@ -0,0 +1,208 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from src.config import CacheSettings
+from src.simplify import LEVELS
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class LRUCache:
+    """In-process LRU bounded by the total size of the cached values in bytes."""
+
+    def __init__(self, max_bytes: int, ttl: float | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        value, expires = entry
+        if expires is not None and expires < time.monotonic():
+            self._remove(key)
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._remove(key)
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires)
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        if self._remove(key):
+            self.stats.invalidations += 1
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size -= len(entry[0])
+        return True
+
+
+class CacheBackend(ABC):
+    """Cache shared between workers, e.g. Redis or memcached."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float | None) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Stand-in for a shared backend, only shared within one process."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, tuple[bytes, float | None]] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        value, expires = self._values.get(key, (None, None))
+        if expires is not None and expires < time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float | None) -> None:
+        expires = time.monotonic() + ttl if ttl is not None else None
+        self._values[key] = (value, expires)
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._values[key] = (str(value).encode(), None)
+        return value
+
+
+class ProjectCache:
+    """Read-through cache for serialized projects and list pages.
+
+    Single projects are keyed by a version of the project that every write
+    to it bumps, and list pages by a generation number that every write
+    bumps, so a write drops all pages at once without having to know which
+    pages contained the project. A document read before a write and stored
+    after it lands under the old version, where nobody looks it up. With a
+    shared backend the version and generation are read from it, so the
+    local tier of a worker never serves an entry another worker
+    invalidated. Without one they only exist in this process, other
+    workers keep serving their entries for up to ``ttl`` seconds.
+    """
+
+    GENERATION_KEY = "projects:generation"
+
+    def __init__(self, local: LRUCache, backend: CacheBackend | None = None) -> None:
+        self.local = local
+        self.backend = backend
+        self._generation = 0
+        self._versions: dict[str, int] = {}
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.local.stats
+
+    async def get(self, key: str) -> bytes | None:
+        value = self.local.get(key)
+        if value is None and self.backend is not None:
+            value = await self.backend.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        """Cache ``value``, ``ttl`` overrides the configured time to live."""
+        self.local.set(key, value, ttl)
+        if self.backend is not None:
+            await self.backend.set(key, value, self.local.ttl if ttl is None else ttl)
+
+    def version_key(self, project_id: str) -> str:
+        return f"projects:{project_id}:version"
+
+    async def project_key(self, project_id: str, level: int | None = None) -> str:
+        """Key of the current version of the project, look it up before
+        reading the project so a concurrent write invalidates it."""
+        return self._project_key(project_id, await self._version(project_id), level)
+
+    def _project_key(self, project_id: str, version: int, level: int | None) -> str:
+        if level is None:
+            return f"projects:{project_id}:v{version}"
+        return f"projects:{project_id}:v{version}:{level}"
+
+    async def _version(self, project_id: str) -> int:
+        if self.backend is not None:
+            return int(await self.backend.get(self.version_key(project_id)) or 0)
+        return self._versions.get(project_id, 0)
+
+    async def list_key(self, *params: object) -> str:
+        if self.backend is not None:
+            generation = await self.backend.get(self.GENERATION_KEY)
+            self._generation = int(generation or 0)
+        return f"projects:list:{self._generation}:" + ":".join(map(str, params))
+
+    async def invalidate(self, project_id: str | None = None) -> None:
+        if project_id is not None:
+            # The entries of the previous version are dropped to free their
+            # space, bumping the version is what invalidates them.
+            version = await self._version(project_id)
+            for level in (None, *LEVELS):
+                key = self._project_key(project_id, version, level)
+                self.local.delete(key)
+                if self.backend is not None:
+                    await self.backend.delete(key)
+            if self.backend is not None:
+                await self.backend.incr(self.version_key(project_id))
+            else:
+                self._versions[project_id] = self._versions.get(project_id, 0) + 1
+
+        if self.backend is not None:
+            self._generation = await self.backend.incr(self.GENERATION_KEY)
+        else:
+            self._generation += 1
+
+
+def build_project_cache(settings: CacheSettings) -> ProjectCache | None:
+    if not settings.enabled:
+        return None
+    backend = InMemoryCacheBackend() if settings.backend == "memory" else None
+    return ProjectCache(LRUCache(settings.max_bytes, settings.ttl), backend)
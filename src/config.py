@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,12 +12,112 @@ class DatabaseSettings(BaseModel):
     db: str
     port: int = 5432
 
+    echo: bool = False
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    # Seconds before a connection is replaced, -1 keeps connections forever.
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # Milliseconds, 0 disables the timeout.
+    statement_timeout: int = 30_000
+    # Per connection cache of asyncpg prepared statements, 0 disables it.
+    prepared_statement_cache_size: int = 256
+    # SQLAlchemy compiled statement cache shared by all connections.
+    query_cache_size: int = 500
+    application_name: str = "fastapi-task"
+    # Connections opened at startup with the hot statements prepared on
+    # them, so the first requests of a new worker do not pay for it.
+    warm_up_connections: int = 2
+    server_settings: dict[str, str] = {}
+
+
+class ReplicaSettings(DatabaseSettings):
+    # Replication lag the application tolerates. Clients read from the primary
+    # for this long after a write, and replica reads are cached no longer.
+    max_lag_seconds: float = 5
+
+
+class UploadSettings(BaseModel):
+    max_bytes: int = 100 * 1024 * 1024
+    max_vertices: int = 5_000_000
+    chunk_size: int = 1024 * 1024
+    import_max_bytes: int = 1024 * 1024 * 1024
+    # A FeatureCollection import is buffered and decoded whole on the event
+    # loop, larger imports are sent as NDJSON.
+    import_collection_max_bytes: int = 16 * 1024 * 1024
+    import_batch_size: int = 500
+    # Worker processes parsing large areas of interest, 0 parses everything
+    # inline on the event loop.
+    parse_workers: int = 0
+    # Bodies up to this size are parsed inline, sending them to a worker costs more.
+    parse_inline_max_bytes: int = 1024 * 1024
+    # Seconds a parse may take, including the wait for a free worker.
+    parse_timeout: float = 30
+
+
+class CacheSettings(BaseModel):
+    enabled: bool = True
+    max_bytes: int = 64 * 1024 * 1024
+    ttl: float | None = 300
+    backend: Literal["none", "memory"] = "none"
+
+
+class SpatialIndexSettings(BaseModel):
+    # Seconds between reloads of the index from the database, which pick up
+    # the writes of other workers. None loads it once at startup.
+    reload_seconds: float | None = None
+
+
+class MetricsSettings(BaseModel):
+    # Times request phases and serves them at /metrics, off by default.
+    enabled: bool = False
+    # Report the phases of each request in a Server-Timing response header.
+    server_timing: bool = True
+
+
+class ProfilerSettings(BaseModel):
+    # Profiles the SQL of every request and logs the findings, off by default.
+    enabled: bool = False
+    # Statements per request before a warning is logged.
+    query_budget: int = 20
+    slow_query_ms: float = 100
+    # Runs of one statement shape within a request that are reported as N+1.
+    repeated_statements: int = 5
+    slowest: int = 5
+
+
+class ServerSettings(BaseModel):
+    # Worker processes serving requests, 0 starts one per CPU core. Ignored
+    # with IS_DEBUG, which runs a single reloading process.
+    workers: int = 1
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard]).
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    http: Literal["auto", "h11", "httptools"] = "auto"
+    # Connections queued by the kernel while all workers are busy accepting.
+    backlog: int = 2048
+    # Seconds an idle connection is kept open, keep it above the idle timeout
+    # of a load balancer in front of the app.
+    keep_alive: int = 5
+    # Seconds in-flight requests get to finish after SIGTERM, None waits for them.
+    graceful_timeout: int | None = 30
+    # Requests after which a worker is replaced, None keeps workers forever.
+    max_requests: int | None = None
+    access_log: bool = True
+
 
 class Settings(BaseSettings):
     web_port: int = 8000
     is_debug: bool = False
+    server: ServerSettings = ServerSettings()
 
     database: DatabaseSettings
+    replica: ReplicaSettings | None = None
+    upload: UploadSettings = UploadSettings()
+    cache: CacheSettings = CacheSettings()
+    spatial_index: SpatialIndexSettings = SpatialIndexSettings()
+    metrics: MetricsSettings = MetricsSettings()
+    profiler: ProfilerSettings = ProfilerSettings()
 
     model_config: SettingsConfigDict = SettingsConfigDict(env_nested_delimiter="__")
 
@@ -1,8 +1,25 @@
 class ProjectDoesNotExists(Exception): ...
 
 
+class InvalidCursor(Exception): ...
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        super().__init__(f"The uploaded file exceeds the limit of {max_bytes} bytes.")
+
+
 class GeoJSONParseException(Exception):
     def __init__(self, message: str = "", errors: list[str] | None = None) -> None:
         self.errors = errors if errors else []
         self.message = message
         super().__init__(self.message)
+
+
+class ParseTimeout(Exception):
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        super().__init__(
+            f"Processing the area of interest took longer than {timeout} seconds."
+        )
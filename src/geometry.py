@@ -0,0 +1,123 @@
+import hashlib
+import struct
+import sys
+from array import array
+
+BoundingBox = tuple[float, float, float, float]
+
+# Packed MultiPolygon layout, little-endian:
+#   header            magic, polygon count, ring count
+#   polygon offsets   uint32[polygons + 1], index of each polygon's first ring
+#   ring offsets      uint32[rings + 1], index of each ring's first position
+#   padding           to an 8 byte boundary
+#   coordinates       float64[positions * 2], interleaved lon, lat
+PACKED_MAGIC = b"PMP1"
+_HEADER = struct.Struct("<4sII")
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def bounding_box(coordinates: list) -> BoundingBox:
+    """Return the (min_lon, min_lat, max_lon, max_lat) envelope of MultiPolygon coordinates."""
+    lons = [point[0] for polygon in coordinates for ring in polygon for point in ring]
+    lats = [point[1] for polygon in coordinates for ring in polygon for point in ring]
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+def content_hash(data: bytes) -> str:
+    """Hex SHA-256 of ``data``.
+
+    Of a packed geometry it identifies the geometry: packing is canonical, the
+    same coordinates always pack to the same bytes whatever the source JSON
+    looked like.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _little_endian(values: array) -> bytes:
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def pack_multipolygon(coordinates: list) -> bytes:
+    polygon_offsets = array("I", [0])
+    ring_offsets = array("I", [0])
+    values = array("d")
+    for polygon in coordinates:
+        for ring in polygon:
+            for lon, lat in ring:
+                values.append(lon)
+                values.append(lat)
+            ring_offsets.append(len(values) // 2)
+        polygon_offsets.append(len(ring_offsets) - 1)
+
+    header = _HEADER.pack(PACKED_MAGIC, len(polygon_offsets) - 1, len(ring_offsets) - 1)
+    offsets = _little_endian(polygon_offsets) + _little_endian(ring_offsets)
+    padding = b"\0" * (-(len(header) + len(offsets)) % 8)
+    return header + offsets + padding + _little_endian(values)
+
+
+class PackedMultiPolygon:
+    """Read-only view over a packed MultiPolygon, nothing is decoded up front."""
+
+    def __init__(self, data: bytes) -> None:
+        magic, polygon_count, ring_count = _HEADER.unpack_from(data)
+        if magic != PACKED_MAGIC:
+            raise ValueError("Not a packed MultiPolygon")
+
+        view = memoryview(data)
+        start = _HEADER.size
+        end = start + 4 * (polygon_count + 1)
+        self.polygon_offsets = self._cast(view[start:end], "I")
+        start, end = end, end + 4 * (ring_count + 1)
+        self.ring_offsets = self._cast(view[start:end], "I")
+        start = end + (-end % 8)
+        self.values = self._cast(view[start:], "d")
+
+    @staticmethod
+    def _cast(view: memoryview, typecode: str) -> memoryview | array:
+        if _LITTLE_ENDIAN:
+            return view.cast(typecode)
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    def __len__(self) -> int:
+        return len(self.polygon_offsets) - 1
+
+    @property
+    def vertices(self) -> int:
+        return self.ring_offsets[-1]
+
+    def ring(self, index: int) -> tuple[memoryview, memoryview]:
+        """Longitudes and latitudes of one ring, as zero-copy strided views."""
+        start, end = self.ring_offsets[index] * 2, self.ring_offsets[index + 1] * 2
+        return self.values[start:end:2], self.values[start + 1 : end : 2]
+
+    def bounding_box(self) -> BoundingBox:
+        lons, lats = self.values[0::2], self.values[1::2]
+        return min(lons), min(lats), max(lons), max(lats)
+
+    def coordinates(self) -> list:
+        values = self.values.tolist()
+        ring_offsets = self.ring_offsets.tolist()
+        polygon_offsets = self.polygon_offsets.tolist()
+        return [
+            [
+                [
+                    [values[position], values[position + 1]]
+                    for position in range(
+                        ring_offsets[ring] * 2, ring_offsets[ring + 1] * 2, 2
+                    )
+                ]
+                for ring in range(polygon_offsets[polygon], polygon_offsets[polygon + 1])
+            ]
+            for polygon in range(len(self))
+        ]
+
+    def to_geojson(self) -> dict:
+        return {
+            "type": "Feature",
+            "geometry": {"type": "MultiPolygon", "coordinates": self.coordinates()},
+        }
@@ -1,13 +1,141 @@
-from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
-                                    create_async_engine)
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import (AsyncConnection, AsyncEngine, AsyncSession,
+                                    async_sessionmaker, create_async_engine)
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.config import DatabaseSettings, ReplicaSettings
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait: float, timed_out: bool) -> None:
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = True
+        try:
+            connection = super()._do_get()
+            timed_out = False
+            return connection
+        finally:
+            self.stats.record(time.perf_counter() - start, timed_out)
+
+    def as_dict(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.stats.checkouts,
+            "timeouts": self.stats.timeouts,
+            "wait_seconds": self.stats.wait_seconds,
+            "max_wait_seconds": self.stats.max_wait_seconds,
+        }
+
+
+def database_url(settings: DatabaseSettings) -> str:
+    return f"postgresql+asyncpg://{settings.user}:{settings.password}@{settings.host}:{settings.port}/{settings.db}"
+
+
+def create_engine(settings: DatabaseSettings) -> AsyncEngine:
+    server_settings = {"application_name": settings.application_name}
+    if settings.statement_timeout:
+        server_settings["statement_timeout"] = str(settings.statement_timeout)
+    server_settings.update(settings.server_settings)
+
+    return create_async_engine(
+        database_url(settings),
+        echo=settings.echo,
+        poolclass=InstrumentedPool,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.pool_timeout,
+        pool_recycle=settings.pool_recycle,
+        pool_pre_ping=settings.pool_pre_ping,
+        query_cache_size=settings.query_cache_size,
+        connect_args={
+            # The asyncpg dialect prepares every statement server side and
+            # keeps the prepared statements per connection in this cache.
+            "prepared_statement_cache_size": settings.prepared_statement_cache_size,
+            "server_settings": server_settings,
+        },
+    )
+
+
+class Database:
+    """Engines and session factories of one worker process.
+
+    Created by the app lifespan, in the worker that uses it, so connections
+    are never shared with the process that started the worker, and importing
+    the app connects to nothing.
+    """
+
+    def __init__(
+        self, settings: DatabaseSettings, replica: ReplicaSettings | None = None
+    ) -> None:
+        self.settings = settings
+        self.replica_settings = replica
+        self.engine = create_engine(settings)
+        self.async_session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.replica_engine = create_engine(replica) if replica is not None else None
+        self.replica_session = (
+            async_sessionmaker(self.replica_engine, expire_on_commit=False)
+            if self.replica_engine is not None
+            else None
+        )
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [engine for engine in (self.engine, self.replica_engine) if engine is not None]
+
+    async def warm_up(self, prepare: Callable[[AsyncSession], Awaitable[None]]) -> None:
+        """Open the ``warm_up_connections`` of each engine, up to its pool
+        size, and run ``prepare`` with a session on every one of them.
+        """
+        warm_up = [(self.engine, self.settings)]
+        if self.replica_engine is not None:
+            warm_up.append((self.replica_engine, self.replica_settings))
+        for engine, settings in warm_up:
+            count = min(settings.warm_up_connections, engine.pool.size())
+            async with AsyncExitStack() as stack:
+                opened = await asyncio.gather(
+                    *(stack.enter_async_context(engine.connect()) for _ in range(count))
+                )
+                await asyncio.gather(*(_prepare(connection, prepare) for connection in opened))
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
 
-from src.config import get_settings
 
-settings = get_settings()
-DATABASE_URL = f"postgresql+asyncpg://{settings.database.user}:{settings.database.password}@{settings.database.host}:{settings.database.port}/{settings.database.db}"
+async def _prepare(
+    connection: AsyncConnection, prepare: Callable[[AsyncSession], Awaitable[None]]
+) -> None:
+    async with AsyncSession(bind=connection) as session:
+        await prepare(session)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
-async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 Base = declarative_base()
@@ -0,0 +1,100 @@
+"""Opt-in SQL profiling, attributed to the request or block that ran the queries.
+
+``install_profiler`` hooks the cursor events of an engine. Statements are only
+recorded inside ``profile_queries``, anywhere else the hooks return after a
+context variable lookup.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryProfile:
+    """Statements run while profiling, with their time and returned rows."""
+
+    def __init__(self, slowest: int = 5, slow_query_seconds: float | None = None) -> None:
+        self.statements: list[str] = []
+        self.total_seconds = 0.0
+        self.rows = 0
+        self.slowest: list[tuple[float, str]] = []
+        self.shapes: Counter[str] = Counter()
+        self._keep_slowest = slowest
+        self._slow_query_seconds = slow_query_seconds
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def record(self, statement: str, seconds: float, rows: int) -> None:
+        self.statements.append(statement)
+        self.total_seconds += seconds
+        self.rows += max(rows, 0)
+        # Parameters are bound, so a statement repeated in a loop has one shape.
+        shape = " ".join(statement.split())
+        self.shapes[shape] += 1
+
+        if self._keep_slowest:
+            self.slowest.append((seconds, shape))
+            self.slowest.sort(key=lambda entry: entry[0], reverse=True)
+            del self.slowest[self._keep_slowest :]
+        if self._slow_query_seconds is not None and seconds > self._slow_query_seconds:
+            logger.warning("Slow query, %.1f ms: %s", seconds * 1000, shape)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes run at least ``threshold`` times, likely an N+1 loop."""
+        return [(shape, count) for shape, count in self.shapes.items() if count >= threshold]
+
+    def as_dict(self) -> dict:
+        return {
+            "statements": self.count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "rows": self.rows,
+            "slowest": [
+                {"ms": round(seconds * 1000, 3), "statement": shape}
+                for seconds, shape in self.slowest
+            ],
+        }
+
+
+_profile: ContextVar[QueryProfile | None] = ContextVar("query_profile", default=None)
+
+
+@contextmanager
+def profile_queries(
+    slowest: int = 5, slow_query_seconds: float | None = None
+) -> Iterator[QueryProfile]:
+    """Record the statements of profiled engines run inside the block."""
+    profile = QueryProfile(slowest, slow_query_seconds)
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _profile.get() is not None:
+        context._profiler_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    start = getattr(context, "_profiler_start", None)
+    if profile is not None and start is not None:
+        profile.record(statement, time.perf_counter() - start, cursor.rowcount)
+
+
+def install_profiler(engine: AsyncEngine) -> None:
+    """Hook the profiler into ``engine``, installing it twice is a no-op."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,16 +1,70 @@
+import logging
+import os
+
 import uvicorn
 
-from src.app import create_app
-from src.config import get_settings
+from src.config import Settings, get_settings
+
+# Imported by each worker, the supervisor process never loads the app, so
+# every worker creates its own engine and connection pool.
+APP = "src.app:create_app"
+
+logger = logging.getLogger(__name__)
+
+
+def warn_process_local_state(settings: Settings, workers: int) -> None:
+    """Warn about the state every worker keeps for itself.
+
+    The response cache and the spatial index live in the worker process, a
+    write through one worker does not reach the copies of the others.
+    """
+    if settings.cache.enabled:
+        ttl = settings.cache.ttl
+        logger.warning(
+            "%d workers keep separate response caches, the other workers serve "
+            "a changed project %s",
+            workers,
+            f"for up to CACHE__TTL={ttl:g} seconds" if ttl is not None else "until it is evicted",
+        )
+    if settings.spatial_index.reload_seconds is None:
+        logger.warning(
+            "%d workers keep separate spatial indexes, /v1/project/contains misses "
+            "the writes of the other workers until SPATIAL_INDEX__RELOAD_SECONDS is set",
+            workers,
+        )
+
+
+def uvicorn_options(settings: Settings) -> dict:
+    """``uvicorn.run`` options, one reloading process in debug, tuned workers otherwise."""
+    if settings.is_debug:
+        return {"reload": True}
+
+    server = settings.server
+    workers = server.workers or os.cpu_count() or 1
+    if workers > 1:
+        warn_process_local_state(settings, workers)
+    return {
+        "workers": workers,
+        "loop": server.loop,
+        "http": server.http,
+        "backlog": server.backlog,
+        "timeout_keep_alive": server.keep_alive,
+        # SIGTERM stops accepting connections and lets in-flight requests
+        # finish, the lifespan shutdown then closes the pools.
+        "timeout_graceful_shutdown": server.graceful_timeout,
+        "limit_max_requests": server.max_requests,
+        "access_log": server.access_log,
+    }
+
 
 if __name__ == "__main__":
     settings = get_settings()
 
     uvicorn.run(
-        f"{__name__}:{create_app.__name__}",
+        APP,
         host="0.0.0.0",
         port=settings.web_port,
-        reload=settings.is_debug,
         server_header=False,
         factory=True,
+        **uvicorn_options(settings),
     )
@@ -0,0 +1,179 @@
+"""Per-request phase timings and their aggregation into Prometheus metrics.
+
+Code marks a phase with ``timed``, as a context manager or a decorator. The
+time is only measured while a request is being timed, outside of one or with
+metrics disabled ``timed`` costs a context variable lookup.
+"""
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+# Upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestTimings:
+    """Seconds spent in every phase of one request."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self.active: set[str] = set()
+        # perf_counter() when the endpoint function returned.
+        self.endpoint_returned: float | None = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        metrics = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def start_timings() -> tuple[RequestTimings, object]:
+    """Time the phases of the current request, returns the timings and a reset token."""
+    timings = RequestTimings()
+    return timings, _timings.set(timings)
+
+
+def stop_timings(token) -> None:
+    _timings.reset(token)
+
+
+def current_timings() -> RequestTimings | None:
+    return _timings.get()
+
+
+class timed:
+    """Add the time spent in the block or the decorated function to ``phase``.
+
+    Nested blocks of the same phase are only counted once.
+    """
+
+    def __init__(self, phase: str) -> None:
+        self.phase = phase
+        self.timings = None
+
+    def __enter__(self) -> None:
+        timings = _timings.get()
+        if timings is not None and self.phase not in timings.active:
+            timings.active.add(self.phase)
+            self.timings, self.start = timings, time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        if self.timings is not None:
+            self.timings.add(self.phase, time.perf_counter() - self.start)
+            self.timings.active.discard(self.phase)
+            self.timings = None
+
+    def __call__(self, function: Callable) -> Callable:
+        phase = self.phase
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def timed_coroutine(*args, **kwargs):
+                with timed(phase):
+                    return await function(*args, **kwargs)
+
+            return timed_coroutine
+
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            with timed(phase):
+                return function(*args, **kwargs)
+
+        return timed_function
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class Metrics:
+    """Request counters and latency histograms per route, in process."""
+
+    def __init__(self) -> None:
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.durations: dict[tuple[str, str], Histogram] = {}
+        self.phases: dict[tuple[str, str, str], Histogram] = {}
+
+    def observe(
+        self, method: str, route: str, status: int, seconds: float, phases: dict[str, float]
+    ) -> None:
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.durations.setdefault((method, route), Histogram()).observe(seconds)
+        for phase, phase_seconds in phases.items():
+            self.phases.setdefault((method, route, phase), Histogram()).observe(
+                phase_seconds
+            )
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = [
+            "# HELP http_requests_total Requests by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            labels = _labels(method=method, route=route, status=str(status))
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.durations.items()):
+            lines += _histogram_lines(
+                "http_request_duration_seconds",
+                _labels(method=method, route=route),
+                histogram,
+            )
+
+        lines += [
+            "# HELP http_request_phase_duration_seconds Time spent in one phase of a request.",
+            "# TYPE http_request_phase_duration_seconds histogram",
+        ]
+        for (method, route, phase), histogram in sorted(self.phases.items()):
+            lines += _histogram_lines(
+                "http_request_phase_duration_seconds",
+                _labels(method=method, route=route, phase=phase),
+                histogram,
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> list[str]:
+    lines, cumulative = [], 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
@@ -1,12 +1,55 @@
+import json
 import uuid
+from typing import Collection
 
-from sqlalchemy import (Column, Date, DateTime, ForeignKey, Integer, String,
-                        Text)
-from sqlalchemy.orm import relationship
+from sqlalchemy import (Column, Computed, Date, DateTime, Float, ForeignKey,
+                        Index, Integer, LargeBinary, String, Text,
+                        literal_column)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, query_expression, relationship
 from sqlalchemy.sql import func
-from sqlalchemy.types import JSON
 
+from src.geometry import PackedMultiPolygon, content_hash, pack_multipolygon
 from src.infrastucture import db
+from src.metrics import timed
+
+
+def render_json(value: dict) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def render_area_of_interest(geojson_text: str | None, geometry: bytes | None) -> str:
+    """Stored GeoJSON text, rendered from the packed geometry for rows without one."""
+    if geojson_text is not None:
+        return geojson_text
+    if geometry is not None:
+        return render_json(PackedMultiPolygon(geometry).to_geojson())
+    return "{}"
+
+
+@timed("encode")
+def render_project(
+    project, area_of_interest: str | None, fields: Collection[str] | None = None
+) -> bytes:
+    """Project document from anything with the project columns as attributes.
+
+    ``fields`` limits the document to a sparse fieldset, ``id`` is always
+    included. ``area_of_interest`` is already serialized and spliced in as is.
+    """
+    document = {"id": project.id}
+    if fields is None or "name" in fields:
+        document["name"] = project.name
+    if fields is None or "description" in fields:
+        document["description"] = project.description
+    if fields is None or "date_range" in fields:
+        document["date_range"] = {
+            "start": project.start_date.isoformat(),
+            "end": project.end_date.isoformat(),
+        }
+    fields_json = render_json(document)
+    if fields is not None and "area_of_interest" not in fields:
+        return fields_json.encode()
+    return f'{fields_json[:-1]},"area_of_interest":{area_of_interest}}}'.encode()
 
 
 class BaseModelMixin:
@@ -17,28 +60,162 @@ class BaseModelMixin:
     )
 
 
+class AreaOfInterestLevel(db.Base):
+    """Simplified GeoJSON of an area of interest for one zoom level."""
+
+    __tablename__ = "area_of_interest_levels"
+
+    area_of_interest_id = Column(
+        String(36),
+        ForeignKey("areas_of_interest.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    level = Column(Integer, primary_key=True)
+    geojson_text = Column(Text, nullable=False)
+
+
 class AreaOfInterest(BaseModelMixin, db.Base):
+    """A distinct geometry, stored once however many projects use it.
+
+    Rows are addressed by the ``content_hash`` of the packed geometry and
+    shared by every project with that geometry. ``reference_count`` counts
+    those projects, the row is deleted with the last of them.
+    """
+
     __tablename__ = "areas_of_interest"
+    __table_args__ = (
+        Index("ix_areas_of_interest_content_hash", "content_hash", unique=True),
+    )
+
+    geometry = Column(LargeBinary, nullable=False)
+    geojson_text = Column(Text, nullable=True)
+    content_hash = Column(String(64), nullable=False)
+    reference_count = Column(Integer, nullable=False, server_default="1")
+    min_lon = Column(Float, nullable=True)
+    min_lat = Column(Float, nullable=True)
+    max_lon = Column(Float, nullable=True)
+    max_lat = Column(Float, nullable=True)
+
+    levels = relationship(AreaOfInterestLevel, passive_deletes=True)
+    level_geojson_text = query_expression()
+    # The packed geometry of a row without text, read queries load it instead
+    # of ``geometry``.
+    fallback_geometry = query_expression()
+
+    @property
+    def geojson_data(self) -> dict:
+        return PackedMultiPolygon(self.geometry).to_geojson()
+
+    @geojson_data.setter
+    def geojson_data(self, value: dict) -> None:
+        self.geometry = pack_multipolygon(value["geometry"]["coordinates"])
+        self.geojson_text = render_json(value)
+        self.content_hash = content_hash(self.geometry)
+
+    def to_json(self) -> str:
+        if self.level_geojson_text is not None:
+            return self.level_geojson_text
+        if self.fallback_geometry is not None:
+            return render_area_of_interest(None, self.fallback_geometry)
+        if self.geojson_text is not None:
+            return self.geojson_text
+        return render_area_of_interest(None, self.geometry)
 
-    geojson_data = Column(JSON, nullable=False)
-    project_id = Column(
+    @classmethod
+    def envelope(cls):
+        return func.box(
+            func.point(cls.min_lon, cls.min_lat), func.point(cls.max_lon, cls.max_lat)
+        )
+
+
+class AreaOfInterestUpload(db.Base):
+    """Hash of an uploaded file's bytes and the area of interest it contained.
+
+    Uploading the same bytes again references the area without parsing them.
+    """
+
+    __tablename__ = "area_of_interest_uploads"
+    __table_args__ = (
+        Index("ix_area_of_interest_uploads_area_of_interest_id", "area_of_interest_id"),
+    )
+
+    upload_hash = Column(String(64), primary_key=True)
+    area_of_interest_id = Column(
         String(36),
-        ForeignKey("projects.id", ondelete="CASCADE"),
+        ForeignKey("areas_of_interest.id", ondelete="CASCADE"),
         nullable=False,
     )
 
 
+Index(
+    "ix_areas_of_interest_envelope",
+    AreaOfInterest.envelope(),
+    postgresql_using="gist",
+)
+
+
+# Top level fields of a project document and the columns they are read from.
+PROJECT_FIELDS = {
+    "id": ("id",),
+    "name": ("name",),
+    "description": ("description",),
+    "date_range": ("start_date", "end_date"),
+    "area_of_interest": (),
+}
+
+# Columns the project list can be sorted by, each backed by a (column, id) index.
+SORT_FIELDS = ("created", "start_date", "end_date", "name")
+
+# Text search configuration of Project.search_vector. "simple" only lowercases,
+# names and descriptions are not necessarily English.
+SEARCH_CONFIG = "simple"
+
+
 class Project(BaseModelMixin, db.Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index(
+            "ix_projects_created_id",
+            "created",
+            "id",
+            postgresql_include=["name", "start_date", "end_date"],
+        ),
+        Index("ix_projects_start_date_id", "start_date", "id"),
+        Index("ix_projects_end_date_id", "end_date", "id"),
+        Index("ix_projects_name_id", "name", "id"),
+        Index("ix_projects_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_projects_area_of_interest_id", "area_of_interest_id"),
+    )
 
     name = Column(String(32), nullable=False)
     description = Column(Text, nullable=True)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
-
-    area_of_interest = relationship(
-        AreaOfInterest, backref="project", passive_deletes=True, uselist=False
+    area_of_interest_id = Column(
+        String(36), ForeignKey("areas_of_interest.id"), nullable=True
     )
+    # Maintained by the database, the name weighs more than the description.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', name), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=False,
+        )
+    )
+    # Relevance to the search of the query that loaded the project, if any.
+    rank = query_expression()
+
+    area_of_interest = relationship(AreaOfInterest)
+
+    @classmethod
+    def active_range(cls):
+        """Inclusive date range of the project, the bounds are inlined so the
+        expression matches ix_projects_active_range."""
+        return func.daterange(cls.start_date, cls.end_date, literal_column("'[]'"))
 
     def to_dict(self) -> dict:
         return {
@@ -50,3 +227,22 @@ class Project(BaseModelMixin, db.Base):
                 self.area_of_interest.geojson_data if self.area_of_interest else {}
             ),
         }
+
+    def to_json(self, fields: Collection[str] | None = None) -> bytes:
+        """Same document as to_dict, with the stored GeoJSON spliced in as is.
+
+        Only the columns of the requested ``fields`` are read.
+        """
+        area_of_interest = None
+        if fields is None or "area_of_interest" in fields:
+            area_of_interest = (
+                self.area_of_interest.to_json() if self.area_of_interest else "{}"
+            )
+        return render_project(self, area_of_interest, fields)
+
+
+Index(
+    "ix_projects_active_range",
+    Project.active_range(),
+    postgresql_using="gist",
+)
@@ -0,0 +1,107 @@
+"""Worker processes for CPU-heavy parsing, so large uploads do not block the event loop."""
+import asyncio
+import importlib
+from concurrent.futures import BrokenExecutor, Executor
+from typing import Any, Callable, TypeVar
+
+from src.config import UploadSettings
+from src.exceptions import ParseTimeout
+
+T = TypeVar("T")
+
+
+def _import(module: str) -> None:
+    importlib.import_module(module)
+
+
+class ParsePool:
+    """Runs functions of large inputs in a process pool, small ones inline.
+
+    Inputs of up to ``inline_max_bytes`` are cheaper to handle than to send to
+    another process. Until ``start`` is called, e.g. when the app is not
+    running its lifespan, everything runs inline.
+
+    A call that takes longer than ``timeout`` seconds, including the wait for a
+    free worker, raises ParseTimeout. A call that has not started yet is
+    cancelled with it, one that is already running keeps its worker busy
+    until it finishes, processes cannot be interrupted safely.
+    """
+
+    def __init__(
+        self, workers: int, inline_max_bytes: int, timeout: float | None = None
+    ) -> None:
+        self.workers = workers
+        self.inline_max_bytes = inline_max_bytes
+        self.timeout = timeout
+        self._executor: Executor | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        # Imported here, most workers never start a pool and multiprocessing
+        # adds to the import time of every one of them.
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Spawned rather than forked, a fork would copy the event loop, the
+        # connection pool and the threads of the parent.
+        self._executor = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def warm_up(self, *modules: str) -> None:
+        """Start every worker and import ``modules`` in it ahead of the first call."""
+        if self._executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self._executor, _import, module)
+                for module in modules
+                for _ in range(self.workers)
+            )
+        )
+
+    def offloads(self, size: int) -> bool:
+        """Whether an input of ``size`` bytes is sent to a worker."""
+        return self._executor is not None and size > self.inline_max_bytes
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        """``function(*args)`` in a worker, inline when the pool is not started.
+
+        ``function`` and its arguments must be picklable, i.e. defined at
+        module level.
+        """
+        if self._executor is None:
+            return function(*args)
+
+        executor = self._executor
+        future = asyncio.get_running_loop().run_in_executor(executor, function, *args)
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError as ex:
+            raise ParseTimeout(self.timeout) from ex
+        except BrokenExecutor:
+            # A worker died, e.g. killed for running out of memory. Replace the
+            # pool so the next calls do not fail as well.
+            if self._executor is executor:
+                self.start()
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    async def shutdown(self) -> None:
+        """Stop the workers, calls that have not started yet are cancelled."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+def build_parse_pool(settings: UploadSettings) -> ParsePool | None:
+    """The app's pool, None when parsing is configured to always run inline."""
+    if settings.parse_workers <= 0:
+        return None
+    return ParsePool(
+        settings.parse_workers, settings.parse_inline_max_bytes, settings.parse_timeout
+    )
@@ -1,12 +1,15 @@
-from json.decoder import JSONDecodeError
-from typing import Literal
+import json
+from typing import Any, Literal
 
 import geojson
 from pydantic import BaseModel
 from pydantic_core import ValidationError
-from sqlalchemy import exc
 
 from src.exceptions import GeoJSONParseException
+from src.metrics import timed
+
+LOAD_ERROR = "The uploaded GeoJSON file could not be loaded correctly. Please check the file."
+CONTENT_ERROR = "The GeoJSON file contains errors"
 
 
 class Geometry(BaseModel):
@@ -19,21 +22,118 @@ class Feature(BaseModel):
     geometry: Geometry
 
 
+def _reject_constant(constant: str) -> Any:
+    raise ValueError(f"Number {constant!r} is not JSON compliant")
+
+
+def _exceeds_vertex_limit(geo_json: dict, max_vertices: int) -> bool:
+    geometry = geo_json.get("geometry") if isinstance(geo_json, dict) else None
+    polygons = geometry.get("coordinates") if isinstance(geometry, dict) else None
+    if not isinstance(polygons, list):
+        return False
+
+    vertices = 0
+    for polygon in polygons:
+        if not isinstance(polygon, list):
+            continue
+        for ring in polygon:
+            if isinstance(ring, list):
+                vertices += len(ring)
+                if vertices > max_vertices:
+                    return True
+    return False
+
+
+def decode_json(data: bytes) -> Any:
+    """Decode JSON the way GeoJsonParser expects it, integers become floats."""
+    try:
+        return json.loads(data, parse_int=float, parse_constant=_reject_constant)
+    except ValueError as ex:
+        raise GeoJSONParseException(LOAD_ERROR, [str(ex)]) from ex
+
+
 class GeoJsonParser:
-    def load(self, data: bytes) -> Feature:
+    """Validates an uploaded GeoJSON Feature and returns its storage representation.
+
+    Well formed documents are checked in a single walk over the decoded JSON.
+    Anything the walk does not accept is handed to the pydantic and geojson
+    validators, so error messages stay the same as they have always been.
+    """
+
+    def __init__(self, max_vertices: int | None = None) -> None:
+        self.max_vertices = max_vertices
+
+    @timed("parse")
+    def load(self, data: bytes) -> dict:
+        return self.load_document(decode_json(data), data)
+
+    @timed("parse")
+    def load_document(self, document: Any, data: bytes | None = None) -> dict:
+        """Validate a document decoded with decode_json, ``data`` is its source if known."""
+        feature = self._read_feature(document)
+        if feature is None:
+            if data is None:
+                data = json.dumps(document).encode()
+            feature = self._validate(data, document)
+
+        if not any(feature["geometry"]["coordinates"]):
+            raise GeoJSONParseException(
+                CONTENT_ERROR, ["The geometry must contain at least one linear ring"]
+            )
+        return feature
+
+    def _read_feature(self, document: Any) -> dict | None:
+        """Single pass over a decoded document, None when it is not a valid Feature."""
+        if type(document) is not dict or document.get("type") != "Feature":
+            return None
+        geometry = document.get("geometry")
+        if type(geometry) is not dict or geometry.get("type") != "MultiPolygon":
+            return None
+        polygons = geometry.get("coordinates")
+        if type(polygons) is not list:
+            return None
+
+        vertices = 0
+        max_vertices = self.max_vertices
+        for polygon in polygons:
+            if type(polygon) is not list:
+                return None
+            for ring in polygon:
+                if type(ring) is not list or len(ring) < 4 or ring[0] != ring[-1]:
+                    return None
+                vertices += len(ring)
+                if max_vertices is not None and vertices > max_vertices:
+                    self._raise_vertex_limit()
+                for position in ring:
+                    if (
+                        type(position) is not list
+                        or len(position) != 2
+                        or type(position[0]) is not float
+                        or type(position[1]) is not float
+                    ):
+                        return None
+
+        return {
+            "type": "Feature",
+            "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+        }
+
+    def _validate(self, data: bytes, document: Any) -> dict:
+        if self.max_vertices is not None and _exceeds_vertex_limit(
+            document, self.max_vertices
+        ):
+            self._raise_vertex_limit()
+
         try:
             geo_json = geojson.loads(data)
-        except JSONDecodeError as ex:
-            raise GeoJSONParseException(
-                "The uploaded GeoJSON file could not be loaded correctly. Please check the file.",
-                [str(ex)],
-            ) from ex
+        except (TypeError, ValueError) as ex:
+            raise GeoJSONParseException(CONTENT_ERROR, [str(ex)]) from ex
 
         try:
-            feature = Feature(**geo_json)
+            Feature.model_validate(geo_json)
         except ValidationError as ex:
             raise GeoJSONParseException(
-                "The GeoJSON file contains errors",
+                CONTENT_ERROR,
                 [
                     error.get("msg", "")
                     for error in ex.errors(
@@ -43,8 +143,11 @@ class GeoJsonParser:
             )
 
         if not geo_json.is_valid:
-            raise GeoJSONParseException(
-                "The GeoJSON file contains errors", geo_json.errors()
-            )
+            raise GeoJSONParseException(CONTENT_ERROR, geo_json.errors())
 
-        return feature
+        return Feature.model_validate(document).model_dump()
+
+    def _raise_vertex_limit(self) -> None:
+        raise GeoJSONParseException(
+            CONTENT_ERROR, [f"The geometry has more than {self.max_vertices} vertices"]
+        )
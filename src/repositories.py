@@ -1,43 +1,415 @@
 from datetime import date
-from typing import Sequence
+from typing import Any, AsyncIterator, Collection, Sequence
 
-from sqlalchemy import delete, select
+from sqlalchemy import (Date, Float, Row, case, delete, func, insert,
+                        literal, literal_column, null, select, text, tuple_, update)
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import (contains_eager, joinedload, load_only,
+                            with_expression)
 
-from src.exceptions import ProjectDoesNotExists
-from src.models import AreaOfInterest, Project
+from src.geometry import BoundingBox
+from src.metrics import timed
+from src.models import (PROJECT_FIELDS, SEARCH_CONFIG, AreaOfInterest,
+                        AreaOfInterestLevel, AreaOfInterestUpload, Project)
+
+
+def _level_geojson_text(level: int):
+    """The stored level closest to ``level`` that has at least its detail."""
+    return (
+        select(AreaOfInterestLevel.geojson_text)
+        .where(
+            AreaOfInterestLevel.area_of_interest_id == AreaOfInterest.id,
+            AreaOfInterestLevel.level >= level,
+        )
+        .order_by(AreaOfInterestLevel.level)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _fallback_geometry():
+    """The packed geometry, only read for rows without stored text."""
+    return case((AreaOfInterest.geojson_text.is_(None), AreaOfInterest.geometry))
+
+
+# Inclusive (active_from, active_to), either bound may be open.
+ActiveRange = tuple[date | None, date | None]
+
+
+def _viewport(bbox: BoundingBox):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return func.box(func.point(min_lon, min_lat), func.point(max_lon, max_lat))
+
+
+def _search_query(search: str):
+    """tsquery of a web search style string: words, "quoted phrases", or, -not."""
+    return func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), search)
+
+
+def _rank(search: str):
+    return func.ts_rank_cd(Project.search_vector, _search_query(search), type_=Float)
+
+
+def _filter(
+    query,
+    bbox: BoundingBox | None,
+    active: ActiveRange | None,
+    search: str | None = None,
+):
+    if bbox is not None:
+        query = query.join(Project.area_of_interest).where(
+            AreaOfInterest.envelope().op("&&")(_viewport(bbox))
+        )
+    if active is not None:
+        active_from, active_to = active
+        period = func.daterange(
+            literal(active_from, Date), literal(active_to, Date), literal_column("'[]'")
+        )
+        query = query.where(Project.active_range().op("&&")(period))
+    if search is not None:
+        query = query.where(Project.search_vector.op("@@")(_search_query(search)))
+    return query
+
+
+def _load_options(
+    fields: Collection[str] | None,
+    level: int | None,
+    joined: bool = False,
+    sort: str | None = None,
+) -> list:
+    """Loader options reading only what the requested fields need.
+
+    Without ``area_of_interest`` in ``fields`` the relationship is not joined
+    and no geometry leaves the database. With it only the stored text of the
+    ``level``, or the full text, is read, the packed geometry just for rows
+    without text. A single project
+    (no ``sort``) also loads ``modified`` for its ETag. A list page only
+    loads its sort column besides the fields, so a page sorted by
+    ``created`` can be answered by an index only scan of
+    ix_projects_created_id. Queries using them populate
+    existing objects, otherwise an object already in the session keeps the
+    level and columns of the query that loaded it first.
+    """
+    options = []
+    if fields is not None:
+        columns = {"id"}
+        if sort is None:
+            columns.add("modified")
+        elif sort != "rank":
+            columns.add(sort.removeprefix("-"))
+        for field in fields:
+            columns.update(PROJECT_FIELDS[field])
+        options.append(
+            load_only(*(getattr(Project, column) for column in sorted(columns)))
+        )
+        if "area_of_interest" not in fields:
+            return options
+
+    if joined:
+        area_of_interest = contains_eager(Project.area_of_interest)
+    else:
+        area_of_interest = joinedload(Project.area_of_interest)
+    if level is None:
+        columns = (AreaOfInterest.id, AreaOfInterest.geojson_text)
+        # With load_only an expression that is not set is deferred, not None.
+        level_geojson_text = null()
+    else:
+        # The full resolution text is only read when no level is stored.
+        columns = (AreaOfInterest.id,)
+        level_geojson_text = func.coalesce(
+            _level_geojson_text(level), AreaOfInterest.geojson_text
+        )
+    options.append(
+        area_of_interest.load_only(*columns).options(
+            with_expression(AreaOfInterest.level_geojson_text, level_geojson_text),
+            with_expression(AreaOfInterest.fallback_geometry, _fallback_geometry()),
+        )
+    )
+    return options
 
 
 class ProjectRepository:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
-    async def get_project(self, project_id: str) -> Project | None:
+    @timed("db")
+    async def get_project(
+        self,
+        project_id: str,
+        level: int | None = None,
+        fields: Collection[str] | None = None,
+    ) -> Project | None:
         query = (
             select(Project)
-            .options(joinedload(Project.area_of_interest))
+            .options(*_load_options(fields, level))
             .where(Project.id == project_id)
             .limit(1)
+            .execution_options(populate_existing=True)
         )
         projects = await self.session.scalars(query)
         return projects.first()
 
-    async def list_projects(
-        self, offset: int | None = None, limit: int | None = None
-    ) -> Sequence[Project]:
-        query = select(Project).options(joinedload(Project.area_of_interest))
+    def list_query(
+        self,
+        offset: int | None = None,
+        limit: int | None = None,
+        after: tuple[Any, str] | None = None,
+        bbox: BoundingBox | None = None,
+        level: int | None = None,
+        fields: Collection[str] | None = None,
+        active: ActiveRange | None = None,
+        sort: str = "created",
+        search: str | None = None,
+    ):
+        """The SELECT behind list_projects.
+
+        ``sort`` is one of SORT_FIELDS, prefixed with ``-`` for descending
+        order, or ``rank`` for the best ``search`` matches first. Ties are
+        broken by id, and ``after`` is the (sort value, id) keyset of the last
+        row of the previous page.
+        """
+        descending = sort.startswith("-")
+        if sort == "rank":
+            column, descending = _rank(search), True
+        else:
+            column = getattr(Project, sort.removeprefix("-"))
+        keyset = tuple_(column, Project.id)
+        if descending:
+            order = (column.desc(), Project.id.desc())
+        else:
+            order = (column, Project.id)
+        query = (
+            select(Project)
+            .order_by(*order)
+            .execution_options(populate_existing=True)
+        )
 
+        query = _filter(query, bbox, active, search)
+        query = query.options(
+            *_load_options(fields, level, joined=bbox is not None, sort=sort)
+        )
+        if sort == "rank":
+            query = query.options(with_expression(Project.rank, column))
+        if after is not None:
+            bound = tuple_(*after)
+            query = query.where(keyset < bound if descending else keyset > bound)
         if offset is not None:
             query = query.offset(offset)
         if limit is not None:
             query = query.limit(limit)
+        return query
 
-        projects = await self.session.scalars(query)
+    @timed("db")
+    async def list_projects(self, *args, **kwargs) -> Sequence[Project]:
+        """Projects selected by list_query, called with the same arguments."""
+        projects = await self.session.scalars(self.list_query(*args, **kwargs))
         return projects.all()
 
-    async def delete(self, project_id: str) -> None:
-        await self.session.execute(delete(Project).where(Project.id == project_id))
+    async def stream_export(self, batch_size: int = 500) -> AsyncIterator[Row]:
+        """All projects in creation order, fetched ``batch_size`` rows at a time
+        from a server-side cursor. Plain rows, nothing enters the identity map.
+        """
+        query = (
+            select(
+                Project.id,
+                Project.name,
+                Project.description,
+                Project.start_date,
+                Project.end_date,
+                AreaOfInterest.geojson_text,
+                _fallback_geometry().label("geometry"),
+            )
+            .outerjoin(Project.area_of_interest)
+            .order_by(Project.created, Project.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(query)
+        async for row in result:
+            yield row
+
+    def count_query(
+        self,
+        bbox: BoundingBox | None = None,
+        active: ActiveRange | None = None,
+        search: str | None = None,
+    ):
+        return _filter(select(func.count()).select_from(Project), bbox, active, search)
+
+    @timed("db")
+    async def count_projects(self, *args, **kwargs) -> int:
+        return await self.session.scalar(self.count_query(*args, **kwargs))
+
+    @timed("db")
+    async def estimate_projects(self) -> int | None:
+        """Row count from planner statistics, None before the table was analyzed."""
+        estimate = await self.session.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": Project.__tablename__},
+        )
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+
+    @timed("db")
+    async def list_geometries(self) -> list[tuple[str, bytes]]:
+        """(project id, packed geometry) of every project, each distinct
+        geometry is read once for all the projects sharing it."""
+        query = (
+            select(AreaOfInterest.geometry, func.array_agg(Project.id))
+            .join(Project, Project.area_of_interest_id == AreaOfInterest.id)
+            .group_by(AreaOfInterest.id)
+        )
+        rows = await self.session.execute(query)
+        return [
+            (project_id, geometry)
+            for geometry, project_ids in rows
+            for project_id in project_ids
+        ]
+
+    @timed("db")
+    async def reference_upload(self, upload_hash: str) -> Row | None:
+        """Take a reference to the area of interest of an upload seen before.
+
+        UPDATE ... RETURNING the stored area, None for bytes never uploaded.
+        """
+        result = await self.session.execute(
+            update(AreaOfInterest)
+            .where(
+                AreaOfInterest.id == AreaOfInterestUpload.area_of_interest_id,
+                AreaOfInterestUpload.upload_hash == upload_hash,
+            )
+            .values(reference_count=AreaOfInterest.reference_count + 1)
+            .returning(
+                AreaOfInterest.id,
+                AreaOfInterest.geometry,
+                AreaOfInterest.geojson_text,
+                AreaOfInterest.min_lon,
+                AreaOfInterest.min_lat,
+                AreaOfInterest.max_lon,
+                AreaOfInterest.max_lat,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return result.first()
+
+    @timed("db")
+    async def reference_areas_of_interest(self, areas: list[dict]) -> dict[str, str]:
+        """INSERT ... ON CONFLICT of areas of interest with distinct content hashes.
+
+        An area whose geometry is already stored is not inserted, the stored
+        one gains the ``reference_count`` of the row instead. Returns the id
+        of the stored area by content hash.
+        """
+        query = postgresql.insert(AreaOfInterest).values(areas)
+        query = query.on_conflict_do_update(
+            index_elements=[AreaOfInterest.content_hash],
+            set_={
+                "reference_count": AreaOfInterest.reference_count
+                + query.excluded.reference_count
+            },
+        )
+        rows = await self.session.execute(
+            query.returning(AreaOfInterest.content_hash, AreaOfInterest.id)
+        )
+        return dict(rows.all())
+
+    @timed("db")
+    async def record_upload(self, upload_hash: str, area_of_interest_id: str) -> None:
+        await self.session.execute(
+            postgresql.insert(AreaOfInterestUpload)
+            .values(upload_hash=upload_hash, area_of_interest_id=area_of_interest_id)
+            .on_conflict_do_nothing()
+        )
+
+    @timed("db")
+    async def release_area_of_interest(self, area_of_interest_id: str) -> None:
+        """Drop one reference to the area, deleting it with the last one."""
+        remaining = await self.session.scalar(
+            update(AreaOfInterest)
+            .where(AreaOfInterest.id == area_of_interest_id)
+            .values(reference_count=AreaOfInterest.reference_count - 1)
+            .returning(AreaOfInterest.reference_count)
+            .execution_options(synchronize_session=False)
+        )
+        if remaining == 0:
+            await self.session.execute(
+                delete(AreaOfInterest).where(
+                    AreaOfInterest.id == area_of_interest_id,
+                    AreaOfInterest.reference_count == 0,
+                )
+            )
+
+    @timed("db")
+    async def insert_levels(self, levels: list[dict]) -> None:
+        await self.session.execute(insert(AreaOfInterestLevel), levels)
+
+    @timed("db")
+    async def delete(self, project_id: str) -> Row | None:
+        """DELETE ... RETURNING the area of interest id, None when the project
+        does not exist."""
+        result = await self.session.execute(
+            delete(Project)
+            .where(Project.id == project_id)
+            .returning(Project.area_of_interest_id)
+        )
+        return result.first()
+
+    @timed("db")
+    async def update_project(
+        self, project_id: str, values: dict, with_area_of_interest: bool = True
+    ) -> Row | None:
+        """UPDATE ... RETURNING the project columns, None when it does not exist.
+
+        With ``with_area_of_interest`` the row also carries the stored GeoJSON
+        text of the area of interest, and its packed geometry only when there
+        is no text. When ``values`` replace the ``area_of_interest_id``, the
+        row carries the ``previous_area_of_interest_id`` read under a row
+        lock. Without ``values`` the same row is selected instead.
+        """
+        columns = [
+            Project.id,
+            Project.name,
+            Project.description,
+            Project.start_date,
+            Project.end_date,
+            Project.modified,
+        ]
+        if with_area_of_interest:
+            area_of_interest = select(AreaOfInterest).where(
+                AreaOfInterest.id == Project.area_of_interest_id
+            )
+            columns += [
+                area_of_interest.with_only_columns(AreaOfInterest.geojson_text)
+                .scalar_subquery()
+                .label("geojson_text"),
+                area_of_interest.with_only_columns(_fallback_geometry())
+                .scalar_subquery()
+                .label("geometry"),
+            ]
+
+        if values:
+            query = update(Project).values(values)
+            if "area_of_interest_id" in values:
+                previous = (
+                    select(Project.id, Project.area_of_interest_id)
+                    .where(Project.id == project_id)
+                    .with_for_update()
+                    .subquery()
+                )
+                query = query.where(Project.id == previous.c.id)
+                columns.append(
+                    previous.c.area_of_interest_id.label("previous_area_of_interest_id")
+                )
+            else:
+                query = query.where(Project.id == project_id)
+            query = query.returning(*columns).execution_options(
+                synchronize_session=False
+            )
+        else:
+            query = select(*columns).where(Project.id == project_id)
+        result = await self.session.execute(query)
+        return result.first()
 
     def create_project(
         self,
@@ -45,23 +417,35 @@ class ProjectRepository:
         description: str,
         start_date: date,
         end_date: date,
-        geojson_data: dict,
+        area_of_interest_id: str,
     ) -> Project:
-        area_of_interest = AreaOfInterest(geojson_data=geojson_data)
-        self.session.add(area_of_interest)
-
         new_project = Project(
             name=name,
             description=description,
             start_date=start_date,
             end_date=end_date,
-            area_of_interest=area_of_interest,
+            area_of_interest_id=area_of_interest_id,
         )
         self.session.add(new_project)
         return new_project
 
+    @timed("db")
+    async def insert_projects(self, projects: list[dict]) -> None:
+        """Multi-row INSERT of already prepared rows, bypassing the unit of work."""
+        await self.session.execute(insert(Project), projects)
+
+    async def warm_up(self) -> None:
+        """Run the statements of the hottest reads once, the engine compiles
+        them and asyncpg prepares them on this session's connection.
+        """
+        await self.get_project("00000000-0000-0000-0000-000000000000")
+        await self.list_projects(0, 11)
+        await self.count_projects()
+
+    @timed("db")
     async def commit(self) -> None:
         await self.session.commit()
 
-    async def refresh(self, project: Project) -> None:
-        await self.session.refresh(project)
+    @timed("db")
+    async def rollback(self) -> None:
+        await self.session.rollback()
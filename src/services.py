@@ -1,16 +1,246 @@
-from datetime import date
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Literal, NamedTuple
 
-from src.exceptions import ProjectDoesNotExists
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.sql import func
+
+from src.cache import ProjectCache
+from src.exceptions import (GeoJSONParseException, InvalidCursor,
+                            ProjectDoesNotExists)
+from src.geometry import (BoundingBox, PackedMultiPolygon, bounding_box,
+                          content_hash, pack_multipolygon)
+from src.metrics import timed
+from src.models import (Project, render_area_of_interest, render_json,
+                        render_project)
+from src.parse_pool import ParsePool
 from src.parsers import GeoJsonParser
-from src.repositories import ProjectRepository
+from src.repositories import ActiveRange, ProjectRepository
+from src.simplify import simplify_levels
+from src.spatial_index import SpatialIndex
+
+
+CountMode = Literal["exact", "estimated"]
+
+
+_CURSOR_VALUES = {
+    "created": datetime.fromisoformat,
+    "start_date": date.fromisoformat,
+    "end_date": date.fromisoformat,
+    "name": str,
+    "rank": float,
+}
+
+
+def encode_cursor(project: Project, sort: str = "created") -> str:
+    field = sort.removeprefix("-")
+    value = getattr(project, field)
+    if field not in ("name", "rank"):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, project.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: str = "created") -> tuple[Any, str]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(payload) == 2:
+            # Cursors issued before sorting was configurable.
+            payload = ["created", *payload]
+        cursor_sort, value, project_id = payload
+        if cursor_sort != sort:
+            raise ValueError("The cursor belongs to another sort order")
+        return _CURSOR_VALUES[sort.removeprefix("-")](value), str(project_id)
+    except (binascii.Error, ValueError, TypeError) as ex:
+        raise InvalidCursor() from ex
+
+
+@timed("simplify")
+def render_levels(coordinates: list) -> dict[int, str]:
+    return {
+        level: render_json(
+            {
+                "type": "Feature",
+                "geometry": {"type": "MultiPolygon", "coordinates": simplified},
+            }
+        )
+        for level, simplified in simplify_levels(coordinates).items()
+    }
+
+
+class PreparedAreaOfInterest(NamedTuple):
+    geometry: bytes
+    geojson_text: str
+    bbox: BoundingBox
+    levels: dict[int, str]
+    content_hash: str
+
+    @classmethod
+    def from_feature(cls, feature: dict) -> "PreparedAreaOfInterest":
+        coordinates = feature["geometry"]["coordinates"]
+        geometry = pack_multipolygon(coordinates)
+        return cls(
+            geometry,
+            render_json(feature),
+            bounding_box(coordinates),
+            render_levels(coordinates),
+            content_hash(geometry),
+        )
+
+    def row(self, area_of_interest_id: str, reference_count: int = 1) -> dict:
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        return {
+            "id": area_of_interest_id,
+            "geometry": self.geometry,
+            "geojson_text": self.geojson_text,
+            "content_hash": self.content_hash,
+            "reference_count": reference_count,
+            "min_lon": min_lon,
+            "min_lat": min_lat,
+            "max_lon": max_lon,
+            "max_lat": max_lat,
+        }
+
+    def level_rows(self, area_of_interest_id: str) -> list[dict]:
+        return [
+            {"area_of_interest_id": area_of_interest_id, "level": level, "geojson_text": text}
+            for level, text in self.levels.items()
+        ]
+
+
+def prepare_area_of_interest(
+    parser: GeoJsonParser, data: bytes
+) -> PreparedAreaOfInterest:
+    """Everything stored for an uploaded area of interest, the CPU-heavy part of a write.
+
+    Runs in a ParsePool worker for large uploads.
+    """
+    return PreparedAreaOfInterest.from_feature(parser.load(data))
+
+
+class ImportItem(NamedTuple):
+    name: str
+    description: str
+    start_date: date
+    end_date: date
+    feature: Any
+
+
+class _ImportRows(NamedTuple):
+    position: int
+    project: dict
+    area_of_interest: PreparedAreaOfInterest
+
+
+class ProjectDocument(NamedTuple):
+    body: bytes
+    modified: datetime
+
+    def to_bytes(self) -> bytes:
+        return self.modified.isoformat().encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ProjectDocument":
+        modified, body = data.split(b"\n", 1)
+        return cls(body, datetime.fromisoformat(modified.decode()))
+
+
+class ProjectPage(NamedTuple):
+    results: list[bytes]
+    has_next_page: bool
+    next_cursor: str | None
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps(
+            [self.has_next_page, self.next_cursor, [len(body) for body in self.results]]
+        )
+        return header.encode() + b"\n" + b"".join(self.results)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ProjectPage":
+        header, bodies = data.split(b"\n", 1)
+        has_next_page, next_cursor, lengths = json.loads(header)
+        results, offset = [], 0
+        for length in lengths:
+            results.append(bodies[offset : offset + length])
+            offset += length
+        return cls(results, has_next_page, next_cursor)
 
 
 class ProjectService:
     def __init__(
-        self, project_repository: ProjectRepository, geojson_parser: GeoJsonParser
+        self,
+        project_repository: ProjectRepository,
+        geojson_parser: GeoJsonParser,
+        spatial_index: SpatialIndex | None = None,
+        cache: ProjectCache | None = None,
+        cache_ttl: float | None = None,
+        parse_pool: ParsePool | None = None,
     ) -> None:
         self.project_repository = project_repository
         self.geojson_parser = geojson_parser
+        self.spatial_index = spatial_index
+        self.cache = cache
+        # Shorter time to live for documents read from a lagging replica.
+        self.cache_ttl = cache_ttl
+        self.parse_pool = parse_pool
+
+    async def prepare_area_of_interest(self, data: bytes) -> PreparedAreaOfInterest:
+        """Parse ``data``, in a worker process when it is too large to parse inline."""
+        if self.parse_pool is None or not self.parse_pool.offloads(len(data)):
+            return prepare_area_of_interest(self.geojson_parser, data)
+        with timed("worker"):
+            return await self.parse_pool.run(
+                prepare_area_of_interest, self.geojson_parser, data
+            )
+
+    async def reference_area_of_interest(
+        self, data: bytes
+    ) -> tuple[str, PreparedAreaOfInterest]:
+        """Id of the stored area of interest of ``data``, with a reference taken.
+
+        Bytes uploaded before are found by their hash and neither parsed nor
+        validated again. Others are parsed, and their geometry is only
+        inserted when no area has the same content hash yet. The levels of a
+        stored area are not returned.
+        """
+        upload_hash = content_hash(data)
+        stored = await self.project_repository.reference_upload(upload_hash)
+        if stored is not None:
+            max_vertices = self.geojson_parser.max_vertices
+            vertices = PackedMultiPolygon(stored.geometry).vertices
+            if max_vertices is None or vertices <= max_vertices:
+                return stored.id, PreparedAreaOfInterest(
+                    stored.geometry,
+                    render_area_of_interest(stored.geojson_text, stored.geometry),
+                    (stored.min_lon, stored.min_lat, stored.max_lon, stored.max_lat),
+                    {},
+                    content_hash(stored.geometry),
+                )
+        if stored is not None or (
+            self.parse_pool is not None and self.parse_pool.offloads(len(data))
+        ):
+            # Drops the reference to an area accepted under a higher vertex
+            # limit, parsing raises the error of the current one. Before a
+            # parse in a worker it returns the connection to the pool.
+            await self.project_repository.rollback()
+
+        area_of_interest = await self.prepare_area_of_interest(data)
+        new_id = str(uuid.uuid4())
+        area_of_interest_ids = await self.project_repository.reference_areas_of_interest(
+            [area_of_interest.row(new_id)]
+        )
+        area_of_interest_id = area_of_interest_ids[area_of_interest.content_hash]
+        if area_of_interest_id == new_id and area_of_interest.levels:
+            await self.project_repository.insert_levels(
+                area_of_interest.level_rows(new_id)
+            )
+        await self.project_repository.record_upload(upload_hash, area_of_interest_id)
+        return area_of_interest_id, area_of_interest
 
     async def create(
         self,
@@ -19,37 +249,245 @@ class ProjectService:
         start_date: date,
         end_date: date,
         geojson_bytes: bytes,
-    ) -> dict:
-        geojson_data = self.geojson_parser.load(geojson_bytes)
+    ) -> bytes:
+        """The new project's document, rendered from the prepared GeoJSON text
+        without decoding the geometry in this process."""
+        area_of_interest_id, area_of_interest = await self.reference_area_of_interest(
+            geojson_bytes
+        )
         project = self.project_repository.create_project(
             name=name,
             description=description,
             start_date=start_date,
             end_date=end_date,
-            geojson_data=geojson_data.model_dump(),
+            area_of_interest_id=area_of_interest_id,
         )
         await self.project_repository.commit()
-        return project.to_dict()
+        if self.spatial_index is not None:
+            self.spatial_index.insert(project.id, area_of_interest.geometry)
+        if self.cache is not None:
+            await self.cache.invalidate()
+        return render_project(project, area_of_interest.geojson_text)
+
+    async def import_projects(
+        self, items: list[ImportItem]
+    ) -> list[str | GeoJSONParseException | DBAPIError]:
+        """Validate and insert one batch of projects in a single transaction.
+
+        Returns the new project id or the error for every item. When the
+        database rejects the batch, its items are retried one by one so a
+        single bad row does not fail the others.
+        """
+        results: list = [None] * len(items)
+        rows = []
+        for position, item in enumerate(items):
+            try:
+                feature = self.geojson_parser.load_document(item.feature)
+            except GeoJSONParseException as ex:
+                results[position] = ex
+                continue
+            rows.append(self._import_rows(position, item, feature))
 
-    async def get(self, project_id: str) -> dict:
-        project = await self.project_repository.get_project(project_id)
+        try:
+            await self._insert(rows)
+        except DBAPIError:
+            await self.project_repository.rollback()
+            for row in rows:
+                try:
+                    await self._insert([row])
+                except DBAPIError as ex:
+                    await self.project_repository.rollback()
+                    results[row.position] = ex
+                else:
+                    results[row.position] = row.project["id"]
+        else:
+            for row in rows:
+                results[row.position] = row.project["id"]
+
+        inserted = [row for row in rows if isinstance(results[row.position], str)]
+        if self.spatial_index is not None:
+            for row in inserted:
+                self.spatial_index.insert(row.project["id"], row.area_of_interest.geometry)
+        if inserted and self.cache is not None:
+            await self.cache.invalidate()
+        return results
+
+    @staticmethod
+    def _import_rows(position: int, item: ImportItem, feature: dict) -> _ImportRows:
+        return _ImportRows(
+            position,
+            {
+                "id": str(uuid.uuid4()),
+                "name": item.name,
+                "description": item.description,
+                "start_date": item.start_date,
+                "end_date": item.end_date,
+            },
+            PreparedAreaOfInterest.from_feature(feature),
+        )
+
+    async def _insert(self, rows: list[_ImportRows]) -> None:
+        """Insert the projects, each distinct geometry of the batch once."""
+        if not rows:
+            return
+        areas: dict[str, dict] = {}
+        for row in rows:
+            area_of_interest = row.area_of_interest
+            if area_of_interest.content_hash not in areas:
+                areas[area_of_interest.content_hash] = area_of_interest.row(
+                    str(uuid.uuid4()), reference_count=0
+                )
+            areas[area_of_interest.content_hash]["reference_count"] += 1
+        area_of_interest_ids = await self.project_repository.reference_areas_of_interest(
+            list(areas.values())
+        )
+
+        # Only inserted areas keep the id generated for them.
+        inserted = {area["id"] for area in areas.values()}
+        projects, levels = [], []
+        for row in rows:
+            area_of_interest = row.area_of_interest
+            area_of_interest_id = area_of_interest_ids[area_of_interest.content_hash]
+            projects.append({**row.project, "area_of_interest_id": area_of_interest_id})
+            if area_of_interest_id in inserted:
+                inserted.remove(area_of_interest_id)
+                levels += area_of_interest.level_rows(area_of_interest_id)
+        await self.project_repository.insert_projects(projects)
+        if levels:
+            await self.project_repository.insert_levels(levels)
+        await self.project_repository.commit()
+
+    async def get(
+        self,
+        project_id: str,
+        level: int | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> ProjectDocument:
+        # Sparse fieldsets are not cached, every combination would need its
+        # own key to invalidate.
+        cache = self.cache if fields is None else None
+        if cache is not None:
+            key = await cache.project_key(project_id, level)
+            cached = await cache.get(key)
+            if cached is not None:
+                return ProjectDocument.from_bytes(cached)
+
+        project = await self.project_repository.get_project(project_id, level, fields)
         if not project:
             raise ProjectDoesNotExists()
-        return project.to_dict()
+        document = ProjectDocument(project.to_json(fields), project.modified)
+
+        if cache is not None:
+            await cache.set(key, document.to_bytes(), self.cache_ttl)
+        return document
 
     async def delete(self, project_id: str) -> None:
-        project = await self.project_repository.get_project(project_id)
-        if not project:
+        deleted = await self.project_repository.delete(project_id=project_id)
+        if deleted is None:
             raise ProjectDoesNotExists()
-        await self.project_repository.delete(project_id=project_id)
+        if deleted.area_of_interest_id is not None:
+            await self.project_repository.release_area_of_interest(
+                deleted.area_of_interest_id
+            )
         await self.project_repository.commit()
+        if self.spatial_index is not None:
+            self.spatial_index.remove(project_id)
+        if self.cache is not None:
+            await self.cache.invalidate(project_id)
+
+    def contains(self, lon: float, lat: float) -> list[str]:
+        if self.spatial_index is None:
+            return []
+        return self.spatial_index.contains(lon, lat)
 
-    async def list(self, page: int = 1, page_size: int = 10) -> tuple[list[dict], bool]:
-        offset = (page - 1) * page_size
-        projects = await self.project_repository.list_projects(offset, page_size + 1)
+    async def list(
+        self,
+        page: int = 1,
+        page_size: int = 10,
+        cursor: str | None = None,
+        bbox: BoundingBox | None = None,
+        level: int | None = None,
+        fields: tuple[str, ...] | None = None,
+        active: ActiveRange | None = None,
+        sort: str = "created",
+        search: str | None = None,
+    ) -> ProjectPage:
+        if self.cache is not None:
+            key = await self.cache.list_key(
+                page, page_size, cursor, bbox, level, fields, active, sort, search
+            )
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return ProjectPage.from_bytes(cached)
+
+        if cursor is not None:
+            projects = await self.project_repository.list_projects(
+                limit=page_size + 1,
+                after=decode_cursor(cursor, sort),
+                bbox=bbox,
+                level=level,
+                fields=fields,
+                active=active,
+                sort=sort,
+                search=search,
+            )
+        else:
+            offset = (page - 1) * page_size
+            projects = await self.project_repository.list_projects(
+                offset,
+                page_size + 1,
+                bbox=bbox,
+                level=level,
+                fields=fields,
+                active=active,
+                sort=sort,
+                search=search,
+            )
         has_next_page = len(projects) == page_size + 1
+        projects = projects[:page_size]
+        next_cursor = None
+        if has_next_page and projects:
+            next_cursor = encode_cursor(projects[-1], sort)
+
+        result = ProjectPage(
+            [project.to_json(fields) for project in projects],
+            has_next_page,
+            next_cursor,
+        )
+
+        if self.cache is not None:
+            await self.cache.set(key, result.to_bytes(), self.cache_ttl)
+        return result
+
+    async def count(
+        self,
+        mode: CountMode = "exact",
+        bbox: BoundingBox | None = None,
+        active: ActiveRange | None = None,
+        search: str | None = None,
+    ) -> int:
+        """Total number of projects matching the filters.
+
+        Exact counts are cached until the next write. Estimated counts come
+        from planner statistics, which only describe the whole table, so with
+        a filter or before the first ANALYZE they fall back to the exact count.
+        """
+        if mode == "estimated" and bbox is None and active is None and search is None:
+            estimate = await self.project_repository.estimate_projects()
+            if estimate is not None:
+                return estimate
 
-        return [project.to_dict() for project in projects[:page_size]], has_next_page
+        if self.cache is not None:
+            key = await self.cache.list_key("count", bbox, active, search)
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return int(cached)
+
+        total = await self.project_repository.count_projects(bbox, active, search)
+
+        if self.cache is not None:
+            await self.cache.set(key, str(total).encode(), self.cache_ttl)
+        return total
 
     async def update(
         self,
@@ -59,26 +497,120 @@ class ProjectService:
         start_date: date | None,
         end_date: date | None,
         geojson_bytes: bytes | None,
-    ) -> dict:
-        project = await self.project_repository.get_project(project_id)
-        if not project:
-            raise ProjectDoesNotExists()
+    ) -> ProjectDocument:
+        """One UPDATE ... RETURNING of the project, geometry is never read back.
 
+        A new area of interest is referenced before the project is updated and
+        the reference to the previous one is released after.
+        """
         fields_to_update = {
             "name": name,
             "description": description,
             "start_date": start_date,
             "end_date": end_date,
         }
+        values = {
+            field: value for field, value in fields_to_update.items() if value is not None
+        }
 
-        for field, value in fields_to_update.items():
-            if value is not None:
-                setattr(project, field, value)
+        area_of_interest = None
+        if geojson_bytes is not None:
+            area_of_interest_id, area_of_interest = await self.reference_area_of_interest(
+                geojson_bytes
+            )
+            values["area_of_interest_id"] = area_of_interest_id
+            values["modified"] = func.now()
 
-        if geojson_bytes is not None and project.area_of_interest:
-            geojson_data = self.geojson_parser.load(geojson_bytes)
-            project.area_of_interest.geojson_data = geojson_data.model_dump()
+        project = await self.project_repository.update_project(
+            project_id, values, with_area_of_interest=area_of_interest is None
+        )
+        if project is None:
+            if area_of_interest is not None:
+                await self.project_repository.rollback()
+            raise ProjectDoesNotExists()
+
+        if area_of_interest is not None:
+            area_of_interest_json = area_of_interest.geojson_text
+            if project.previous_area_of_interest_id is not None:
+                await self.project_repository.release_area_of_interest(
+                    project.previous_area_of_interest_id
+                )
+        else:
+            area_of_interest_json = render_area_of_interest(
+                project.geojson_text, project.geometry
+            )
 
         await self.project_repository.commit()
-        await self.project_repository.refresh(project)
-        return project.to_dict()
+        if area_of_interest is not None and self.spatial_index is not None:
+            self.spatial_index.insert(project_id, area_of_interest.geometry)
+        if self.cache is not None:
+            await self.cache.invalidate(project_id)
+        return ProjectDocument(
+            render_project(project, area_of_interest_json), project.modified
+        )
+
+
+ExportFormat = Literal["ndjson", "geojson"]
+
+
+class ProjectExporter:
+    """Streams every project as a GeoJSON Feature with the project in ``properties``.
+
+    The output of the ndjson format can be fed back to the bulk import. The
+    exporter opens its own session because a streamed response outlives the
+    request scoped one.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int = 500,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+
+    async def stream(self, format: ExportFormat = "ndjson") -> AsyncIterator[bytes]:
+        if format == "ndjson":
+            head, separator, tail = b"", b"\n", b"\n"
+        else:
+            head, separator, tail = b'{"type":"FeatureCollection","features":[', b",", b"]}"
+
+        buffer = bytearray(head)
+        first = True
+        async with self.session_factory() as session:
+            rows = ProjectRepository(session).stream_export(self.batch_size)
+            async for row in rows:
+                if not first:
+                    buffer += separator
+                first = False
+                buffer += self._feature(row)
+                if len(buffer) >= self.chunk_size:
+                    yield bytes(buffer)
+                    buffer.clear()
+        if format == "geojson" or not first:
+            buffer += tail
+        if buffer:
+            yield bytes(buffer)
+
+    @staticmethod
+    def _feature(row) -> bytes:
+        members = render_json(
+            {
+                "id": row.id,
+                "properties": {
+                    "name": row.name,
+                    "description": row.description,
+                    "date_range": {
+                        "start": row.start_date.isoformat(),
+                        "end": row.end_date.isoformat(),
+                    },
+                },
+            }
+        )[1:]
+        if row.geojson_text is None and row.geometry is None:
+            area_of_interest = '{"type":"Feature","geometry":null}'
+        else:
+            area_of_interest = render_area_of_interest(row.geojson_text, row.geometry)
+        return f"{area_of_interest[:-1]},{members}".encode()
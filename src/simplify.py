@@ -0,0 +1,108 @@
+"""Level-of-detail versions of MultiPolygon coordinates for map clients."""
+
+# Zoom levels a simplified version is precomputed for. Each one is simplified
+# with the tolerance of a single 256px web map tile pixel at that zoom.
+LEVELS = (4, 8, 12)
+
+
+def pixel_size(zoom: int) -> float:
+    """Width of a 256px tile pixel in degrees of longitude."""
+    return 360 / (256 * 2**zoom)
+
+
+def select_level(zoom: int | None = None, tolerance: float | None = None) -> int | None:
+    """Coarsest stored level that is still detailed enough, None for full resolution."""
+    if tolerance is None and zoom is None:
+        return None
+    if tolerance is None:
+        tolerance = pixel_size(zoom)
+    for level in LEVELS:
+        if pixel_size(level) <= tolerance:
+            return level
+    return None
+
+
+def _douglas_peucker(ring: list, tolerance: float) -> list:
+    keep = [False] * len(ring)
+    keep[0] = keep[-1] = True
+    max_distance = tolerance * tolerance
+    stack = [(0, len(ring) - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        ax, ay = ring[start]
+        dx, dy = ring[end][0] - ax, ring[end][1] - ay
+        segment = dx * dx + dy * dy
+        farthest, index = -1.0, -1
+        for position in range(start + 1, end):
+            px, py = ring[position][0] - ax, ring[position][1] - ay
+            if segment:
+                t = (px * dx + py * dy) / segment
+                if t > 1.0:
+                    px, py = px - dx, py - dy
+                elif t > 0.0:
+                    px, py = px - t * dx, py - t * dy
+            distance = px * px + py * py
+            if distance > farthest:
+                farthest, index = distance, position
+        if farthest > max_distance:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return [position for position, kept in zip(ring, keep) if kept]
+
+
+def _minimal_ring(ring: list) -> list | None:
+    """Closed triangle spanning the ring, for shapes smaller than the tolerance.
+
+    None for a ring without three non collinear positions, it has no triangle.
+    """
+    (ax, ay), positions = ring[0], range(len(ring) - 1)
+    far = max(positions, key=lambda i: (ring[i][0] - ax) ** 2 + (ring[i][1] - ay) ** 2)
+    dx, dy = ring[far][0] - ax, ring[far][1] - ay
+    wide = max(
+        positions, key=lambda i: abs((ring[i][0] - ax) * dy - (ring[i][1] - ay) * dx)
+    )
+    corners = sorted({0, far, wide})
+    if len(corners) < 3:
+        return None
+    return [ring[i] for i in corners] + [ring[0]]
+
+
+def simplify_multipolygon(coordinates: list, tolerance: float) -> list:
+    """Simplify every ring, dropping rings that collapse below 4 positions.
+
+    The result always keeps at least one polygon and every ring stays closed.
+    A shape that cannot be reduced to a valid ring is returned unchanged.
+    """
+    simplified = []
+    for polygon in coordinates:
+        exterior, *holes = (_douglas_peucker(ring, tolerance) for ring in polygon)
+        if len(exterior) >= 4:
+            simplified.append([exterior, *(hole for hole in holes if len(hole) >= 4)])
+
+    if not simplified:
+        largest = max(coordinates, key=lambda polygon: len(polygon[0]))
+        ring = _minimal_ring(largest[0])
+        if ring is None:
+            return coordinates
+        simplified.append([ring])
+    return simplified
+
+
+def simplify_levels(coordinates: list) -> dict[int, list]:
+    """Simplified coordinates per level, skipping levels that would not remove any vertex.
+
+    Each level is simplified from the next finer one, so the work shrinks with
+    every level. The accumulated error stays below the sum of the tolerances.
+    """
+    vertices = sum(len(ring) for polygon in coordinates for ring in polygon)
+    levels = {}
+    for level in sorted(LEVELS, reverse=True):
+        simplified = simplify_multipolygon(coordinates, pixel_size(level))
+        simplified_vertices = sum(len(ring) for polygon in simplified for ring in polygon)
+        if simplified_vertices < vertices:
+            levels[level] = coordinates = simplified
+            vertices = simplified_vertices
+    return levels
@@ -0,0 +1,222 @@
+import math
+from typing import Iterable
+
+from src.geometry import BoundingBox, PackedMultiPolygon
+
+NODE_CAPACITY = 16
+
+
+class _Ring:
+    __slots__ = ("bbox", "xs", "ys")
+
+    def __init__(self, xs: Iterable[float], ys: Iterable[float]) -> None:
+        self.xs = tuple(xs)
+        self.ys = tuple(ys)
+        self.bbox = (min(self.xs), min(self.ys), max(self.xs), max(self.ys))
+
+
+def _polygons(geometry: bytes) -> list[list[_Ring]]:
+    """Rings of a packed MultiPolygon, copied from its views without building
+    the nested coordinate lists."""
+    packed = PackedMultiPolygon(geometry)
+    offsets = packed.polygon_offsets.tolist()
+    return [
+        [_Ring(*packed.ring(ring)) for ring in range(offsets[polygon], offsets[polygon + 1])]
+        for polygon in range(len(packed))
+    ]
+
+
+class _Entry:
+    __slots__ = ("project_id", "bbox", "polygons")
+
+    def __init__(self, project_id: str, polygons: list[list[_Ring]]) -> None:
+        self.project_id = project_id
+        self.polygons = polygons
+        # The envelope of the exterior rings, holes lie within them.
+        exteriors = [polygon[0].bbox for polygon in polygons]
+        self.bbox = (
+            min(bbox[0] for bbox in exteriors),
+            min(bbox[1] for bbox in exteriors),
+            max(bbox[2] for bbox in exteriors),
+            max(bbox[3] for bbox in exteriors),
+        )
+
+    def contains(self, lon: float, lat: float) -> bool:
+        return any(_polygon_contains(polygon, lon, lat) for polygon in self.polygons)
+
+
+class _Node:
+    __slots__ = ("bbox", "children", "is_leaf")
+
+    def __init__(self, children: list, is_leaf: bool) -> None:
+        self.children = children
+        self.is_leaf = is_leaf
+        self.bbox = (
+            min(child.bbox[0] for child in children),
+            min(child.bbox[1] for child in children),
+            max(child.bbox[2] for child in children),
+            max(child.bbox[3] for child in children),
+        )
+
+
+def _bbox_contains(bbox: BoundingBox, lon: float, lat: float) -> bool:
+    return bbox[0] <= lon <= bbox[2] and bbox[1] <= lat <= bbox[3]
+
+
+def _ring_crossings(ring: _Ring, lon: float, lat: float) -> bool:
+    inside = False
+    xs, ys = ring.xs, ring.ys
+    x1, y1 = xs[-1], ys[-1]
+    for x2, y2 in zip(xs, ys):
+        if (y2 > lat) != (y1 > lat) and lon < (x1 - x2) * (lat - y2) / (y1 - y2) + x2:
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def _polygon_contains(polygon: list[_Ring], lon: float, lat: float) -> bool:
+    exterior, *holes = polygon
+    if not _bbox_contains(exterior.bbox, lon, lat) or not _ring_crossings(
+        exterior, lon, lat
+    ):
+        return False
+    return not any(
+        _bbox_contains(hole.bbox, lon, lat) and _ring_crossings(hole, lon, lat)
+        for hole in holes
+    )
+
+
+def _center(item: _Entry | _Node) -> tuple[float, float]:
+    min_lon, min_lat, max_lon, max_lat = item.bbox
+    return (min_lon + max_lon) / 2, (min_lat + max_lat) / 2
+
+
+def _str_pack(items: list, is_leaf: bool) -> list[_Node]:
+    """Sort-Tile-Recursive packing of one tree level."""
+    node_count = math.ceil(len(items) / NODE_CAPACITY)
+    slice_size = math.ceil(math.sqrt(node_count)) * NODE_CAPACITY
+    items = sorted(items, key=lambda item: _center(item)[0])
+
+    nodes = []
+    for start in range(0, len(items), slice_size):
+        vertical_slice = sorted(
+            items[start : start + slice_size], key=lambda item: _center(item)[1]
+        )
+        for offset in range(0, len(vertical_slice), NODE_CAPACITY):
+            nodes.append(_Node(vertical_slice[offset : offset + NODE_CAPACITY], is_leaf))
+    return nodes
+
+
+class SpatialIndex:
+    """Process-local STR-packed R-tree over project areas of interest.
+
+    Every worker process keeps its own copy, changes made through another
+    worker become visible after that process reloads the index.
+    Inserts after the bulk load go to a small overflow list that is scanned
+    linearly; the tree is repacked once enough inserts and removals accumulate.
+    """
+
+    def __init__(self, rebuild_threshold: int = 256) -> None:
+        self.rebuild_threshold = rebuild_threshold
+        self._entries: dict[str, _Entry] = {}
+        self._root: _Node | None = None
+        self._pending: list[_Entry] = []
+        self._stale = 0
+        # Inserts (project id, entry) and removals (project id, None) since
+        # start_reload, while a reloaded index is built.
+        self._journal: list[tuple[str, _Entry | None]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def bulk_load(self, geometries: Iterable[tuple[str, bytes]]) -> None:
+        """Index (project id, packed geometry) pairs, projects sharing a
+        geometry share its rings."""
+        polygons: dict[bytes, list[list[_Ring]]] = {}
+        self._entries = {}
+        for project_id, geometry in geometries:
+            if geometry not in polygons:
+                polygons[geometry] = _polygons(geometry)
+            self._entries[project_id] = _Entry(project_id, polygons[geometry])
+        self._rebuild()
+
+    def insert(self, project_id: str, geometry: bytes) -> None:
+        self._insert(_Entry(project_id, _polygons(geometry)))
+
+    def remove(self, project_id: str) -> None:
+        if self._journal is not None:
+            self._journal.append((project_id, None))
+        if self._entries.pop(project_id, None) is not None:
+            self._stale += 1
+            self._maybe_rebuild()
+
+    def start_reload(self) -> None:
+        """Record the inserts and removals from now on, until finish_reload.
+
+        Call it before the projects of the reloaded index are read, a change
+        made while they are read may be missing from them.
+        """
+        self._journal = []
+
+    def finish_reload(self, reloaded: "SpatialIndex | None") -> None:
+        """Take over the entries of ``reloaded`` and replay the changes
+        recorded since start_reload on them, None only stops recording."""
+        journal, self._journal = self._journal or [], None
+        if reloaded is None:
+            return
+        self._entries = reloaded._entries
+        self._root = reloaded._root
+        self._pending = reloaded._pending
+        self._stale = reloaded._stale
+        for project_id, entry in journal:
+            if entry is None:
+                self.remove(project_id)
+            else:
+                self._insert(entry)
+
+    def _insert(self, entry: _Entry) -> None:
+        if self._journal is not None:
+            self._journal.append((entry.project_id, entry))
+        if entry.project_id in self._entries:
+            self._stale += 1
+        self._entries[entry.project_id] = entry
+        self._pending.append(entry)
+        self._maybe_rebuild()
+
+    def contains(self, lon: float, lat: float) -> list[str]:
+        """Return ids of projects whose area of interest contains the point."""
+        return [
+            entry.project_id
+            for entry in self._candidates(lon, lat)
+            if self._entries.get(entry.project_id) is entry and entry.contains(lon, lat)
+        ]
+
+    def _candidates(self, lon: float, lat: float) -> Iterable[_Entry]:
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            for child in node.children:
+                if _bbox_contains(child.bbox, lon, lat):
+                    if node.is_leaf:
+                        yield child
+                    else:
+                        stack.append(child)
+        for entry in self._pending:
+            if _bbox_contains(entry.bbox, lon, lat):
+                yield entry
+
+    def _maybe_rebuild(self) -> None:
+        if len(self._pending) + self._stale > max(
+            self.rebuild_threshold, len(self._entries) // 10
+        ):
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        nodes = list(self._entries.values())
+        is_leaf = True
+        while len(nodes) > NODE_CAPACITY or (is_leaf and nodes):
+            nodes = _str_pack(nodes, is_leaf)
+            is_leaf = False
+        self._root = _Node(nodes, is_leaf) if nodes else None
+        self._pending = []
+        self._stale = 0
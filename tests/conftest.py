@@ -8,14 +8,16 @@ import pytest_asyncio
 from faker import Faker
 from httpx import ASGITransport, AsyncClient
 from pydantic.types import PaymentCardBrand
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, select, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
-from src.api.deps import get_session
+from src.api.deps import get_session, get_session_factory
 from src.app import create_app
 from src.config import get_settings
+from src.geometry import bounding_box
 from src.infrastucture.db import Base
+from src.infrastucture.profiler import install_profiler, profile_queries
 from src.models import AreaOfInterest, Project
 
 settings = get_settings()
@@ -29,16 +31,18 @@ engine = create_async_engine(DATABASE_URL, echo=False, future=True, poolclass=Nu
 faker = Faker()
 
 
-def create_test_database():
+def create_test_database(database=None, name=TEST_DATABASE_NAME):
+    database = database or settings.database
     admin_engine = create_engine(
-        f"postgresql://{settings.database.user}:{settings.database.password}"
-        f"@{settings.database.host}:{settings.database.port}/postgres"
+        f"postgresql://{database.user}:{database.password}"
+        f"@{database.host}:{database.port}/postgres"
     )
 
     with admin_engine.connect() as conn:
         conn.execute(text("COMMIT"))
-        conn.execute(text(f"DROP DATABASE IF EXISTS {TEST_DATABASE_NAME};"))
-        conn.execute(text(f"CREATE DATABASE {TEST_DATABASE_NAME}"))
+        conn.execute(text(f"DROP DATABASE IF EXISTS {name};"))
+        conn.execute(text(f"CREATE DATABASE {name}"))
+    admin_engine.dispose()
 
 
 async def create_tables():
@@ -72,20 +76,39 @@ async def test_db():
         await session.close()
 
 
-@pytest.fixture
-def app():
-    return create_app()
+@pytest_asyncio.fixture
+async def app(test_db, monkeypatch):
+    """The app with the resources of its lifespan, on the test database."""
+    monkeypatch.setattr(get_settings().database, "db", TEST_DATABASE_NAME)
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        yield app
 
 
 @pytest_asyncio.fixture
 async def client(test_db, app):
     app.dependency_overrides[get_session] = lambda: test_db
+    app.dependency_overrides[get_session_factory] = lambda: async_sessionmaker(
+        engine, expire_on_commit=False
+    )
     async with AsyncClient(
         transport=ASGITransport(app=app), base_url="http://test"
     ) as test_client:
         yield test_client
 
 
+@pytest.fixture
+def query_profile():
+    """``profile_queries`` for the test engine, e.g. to assert query counts.
+
+    with query_profile() as profile:
+        await client.get(...)
+    assert profile.count == 1
+    """
+    install_profiler(engine)
+    return profile_queries
+
+
 @pytest.fixture
 def geojson():
     return {
@@ -132,9 +155,25 @@ def create_project(test_db, geojson):
 
         area_of_interest_data = kwargs.get("geojson_data", geojson)
 
+        min_lon, min_lat, max_lon, max_lat = bounding_box(
+            area_of_interest_data["geometry"]["coordinates"]
+        )
         area_of_interest = AreaOfInterest(
-            geojson_data=area_of_interest_data, project_id=project.id
+            geojson_data=area_of_interest_data,
+            min_lon=min_lon,
+            min_lat=min_lat,
+            max_lon=max_lon,
+            max_lat=max_lat,
+        )
+        # Projects with the same geometry share its area of interest.
+        stored = await test_db.scalar(
+            select(AreaOfInterest).where(
+                AreaOfInterest.content_hash == area_of_interest.content_hash
+            )
         )
+        if stored is not None:
+            stored.reference_count += 1
+            area_of_interest = stored
 
         project.area_of_interest = area_of_interest
 
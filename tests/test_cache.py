@@ -0,0 +1,84 @@
+import pytest
+
+from src.cache import InMemoryCacheBackend, LRUCache, ProjectCache
+
+
+def test_lru_cache_evicts_least_recently_used_by_size():
+    cache = LRUCache(max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.get("a") == b"1234"
+
+    cache.set("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"1234"
+    assert cache.size == 8
+    assert cache.stats.as_dict() == {
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "invalidations": 0,
+    }
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr("src.cache.time.monotonic", lambda: now)
+    cache = LRUCache(max_bytes=10, ttl=5)
+    cache.set("a", b"1")
+
+    cache.set("b", b"1", ttl=1)
+
+    now = 102.0
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+
+    now = 106.0
+    assert cache.get("a") is None
+    assert cache.size == 0
+
+
+@pytest.mark.asyncio
+async def test_project_cache_invalidation_through_shared_backend():
+    backend = InMemoryCacheBackend()
+    worker_a = ProjectCache(LRUCache(max_bytes=1024), backend)
+    worker_b = ProjectCache(LRUCache(max_bytes=1024), backend)
+
+    project_key = await worker_a.project_key("p1")
+    await worker_a.set(project_key, b"project")
+    list_key = await worker_a.list_key(1, 10)
+    await worker_a.set(list_key, b"page")
+    assert await worker_b.get(await worker_b.project_key("p1")) == b"project"
+    assert await worker_b.list_key(1, 10) == list_key
+
+    await worker_a.invalidate("p1")
+
+    assert await backend.get(project_key) is None
+    assert await worker_b.list_key(1, 10) != list_key
+
+
+@pytest.mark.asyncio
+async def test_project_cache_local_tier_follows_shared_version():
+    backend = InMemoryCacheBackend()
+    worker_a = ProjectCache(LRUCache(max_bytes=1024), backend)
+    worker_b = ProjectCache(LRUCache(max_bytes=1024), backend)
+    await worker_a.set(await worker_a.project_key("p"), b"v1")
+
+    await worker_b.invalidate("p")
+
+    assert await worker_a.get(await worker_a.project_key("p")) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", [None, InMemoryCacheBackend()])
+async def test_project_cache_drops_document_read_before_write(backend):
+    cache = ProjectCache(LRUCache(max_bytes=1024), backend)
+    # A miss reads the project, a write invalidates it before the read
+    # stores what it found.
+    key = await cache.project_key("p", 8)
+    await cache.invalidate("p")
+    await cache.set(key, b"v1")
+
+    assert await cache.get(await cache.project_key("p", 8)) is None
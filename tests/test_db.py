@@ -0,0 +1,69 @@
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError
+
+from src.config import get_settings
+from src.infrastucture.db import InstrumentedPool, create_engine
+from tests.conftest import TEST_DATABASE_NAME
+
+
+@pytest.mark.asyncio
+async def test_engine_pool_settings_and_stats():
+    settings = get_settings().database.model_copy(
+        update={
+            "db": TEST_DATABASE_NAME,
+            "pool_size": 1,
+            "max_overflow": 1,
+            "pool_timeout": 0.05,
+            "statement_timeout": 1234,
+        }
+    )
+    engine = create_engine(settings)
+    assert isinstance(engine.pool, InstrumentedPool)
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            timeout = await first.scalar(text("SHOW statement_timeout"))
+            assert timeout == "1234ms"
+            await second.scalar(text("SELECT 1"))
+            stats = engine.pool.as_dict()
+            assert (stats["checked_out"], stats["overflow"]) == (2, 1)
+
+            with pytest.raises(TimeoutError):
+                await engine.connect()
+
+        stats = engine.pool.as_dict()
+        assert stats["checked_out"] == 0
+        assert (stats["checkouts"], stats["timeouts"]) == (3, 1)
+        assert stats["max_wait_seconds"] >= 0.05
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_endpoint(client):
+    response = await client.get("/db/pool/stats")
+    assert response.status_code == 200
+    assert response.json()["pool"] == "InstrumentedPool"
+    assert response.json()["max_overflow"] == get_settings().database.max_overflow
+
+
+
+def test_import_creates_no_engine():
+    # The engine, and with it the asyncpg driver, belong to the lifespan.
+    code = "import sys, src.app; assert 'asyncpg' not in sys.modules, 'asyncpg imported'"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@pytest.mark.asyncio
+async def test_lifespan_warms_up_pool(app):
+    engine = app.state.database.engine
+    assert engine.pool.checkedin() == get_settings().database.warm_up_connections
+
+    async with engine.connect() as connection:
+        prepared = await connection.scalars(
+            text("SELECT statement FROM pg_prepared_statements")
+        )
+        assert any("FROM projects" in statement for statement in prepared)
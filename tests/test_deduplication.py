@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from src.exceptions import GeoJSONParseException
+from src.models import AreaOfInterest, AreaOfInterestUpload
+
+PROJECT_DATA = json.dumps(
+    {"name": "season", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}}
+)
+
+
+async def create(client, content: str) -> str:
+    response = await client.post(
+        "/v1/project/geojson",
+        params={"data": PROJECT_DATA},
+        content=content,
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+async def reference_counts(test_db) -> list[int]:
+    test_db.expire_all()
+    return list(await test_db.scalars(select(AreaOfInterest.reference_count)))
+
+
+@pytest.mark.asyncio
+async def test_duplicate_uploads_share_area_of_interest(client, test_db, geojson):
+    first = await create(client, json.dumps(geojson))
+    # Other bytes, the same geometry.
+    second = await create(client, json.dumps(geojson, indent=2))
+    assert await reference_counts(test_db) == [2]
+
+    response = await client.delete(f"/v1/project/{first}")
+    assert response.status_code == 204
+    assert await reference_counts(test_db) == [1]
+    response = await client.get(f"/v1/project/{second}")
+    assert response.json()["area_of_interest"] == geojson
+
+    response = await client.delete(f"/v1/project/{second}")
+    assert response.status_code == 204
+    assert await reference_counts(test_db) == []
+    assert list(await test_db.scalars(select(AreaOfInterestUpload))) == []
+
+
+@pytest.mark.asyncio
+async def test_uploaded_bytes_are_not_parsed_again(client, app, test_db, geojson, monkeypatch):
+    content = json.dumps(geojson)
+    await create(client, content)
+
+    def load(data: bytes) -> dict:
+        raise GeoJSONParseException("unexpected", ["parsed again"])
+
+    monkeypatch.setattr(app.state.geojson_parser, "load", load)
+    project_id = await create(client, content)
+    assert await reference_counts(test_db) == [2]
+    response = await client.get(f"/v1/project/{project_id}")
+    assert response.json()["area_of_interest"] == geojson
+
+    # Accepted before, over the limit now.
+    monkeypatch.undo()
+    monkeypatch.setattr(app.state.geojson_parser, "max_vertices", 3)
+    response = await client.post(
+        "/v1/project/geojson",
+        params={"data": PROJECT_DATA},
+        content=content,
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 422
+    assert await reference_counts(test_db) == [2]
+
+
+@pytest.mark.asyncio
+async def test_replace_shared_area_of_interest(client, test_db, geojson):
+    content = json.dumps(geojson)
+    first, second = await create(client, content), await create(client, content)
+
+    replaced = {
+        **geojson,
+        "geometry": {
+            "type": "MultiPolygon",
+            "coordinates": [[[[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 1.0]]]],
+        },
+    }
+    response = await client.put(
+        f"/v1/project/{first}/area_of_interest",
+        content=json.dumps(replaced),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 200
+    assert sorted(await reference_counts(test_db)) == [1, 1]
+
+    response = await client.get(f"/v1/project/{first}")
+    assert response.json()["area_of_interest"] == replaced
+    response = await client.get(f"/v1/project/{second}")
+    assert response.json()["area_of_interest"] == geojson
+
+    # The same geometry again keeps its area.
+    response = await client.put(
+        f"/v1/project/{first}/area_of_interest",
+        content=json.dumps(replaced),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 200
+    assert sorted(await reference_counts(test_db)) == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_import_deduplicates_areas_of_interest(client, test_db, create_project, geojson):
+    await create_project()
+    properties = {"name": "imported", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}}
+    body = "\n".join(json.dumps({**geojson, "properties": properties}) for _ in range(3))
+
+    response = await client.post(
+        "/v1/project/import",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.json()["created"] == 3
+    assert await reference_counts(test_db) == [4]
+
+    response = await client.get("/v1/project/contains", params={"lon": -52.83, "lat": -5.65})
+    assert len(response.json()["project_ids"]) == 3
@@ -1,5 +1,17 @@
+import asyncio
 import pytest
 import json
+import math
+
+from sqlalchemy import text
+from starlette.requests import Request
+
+from src.api.docs import API_DOCS
+from src.api.uploads import FORM_OVERHEAD_BYTES
+from src.app import reload_spatial_index
+from src.config import get_settings
+from src.exceptions import UploadTooLarge
+from src.repositories import ProjectRepository
 
 
 @pytest.mark.asyncio
@@ -42,9 +54,17 @@ async def test_get_project(client, create_project):
     assert data["area_of_interest"] == project.area_of_interest.geojson_data
 
 
-@pytest.mark.skip(
-    reason="Correct test, but the logic for parsing and storing latitude and longitude needs improvement."
-)
+@pytest.mark.asyncio
+async def test_get_project_renders_missing_geojson_text(client, test_db, create_project, geojson):
+    project = await create_project()
+    project.area_of_interest.geojson_text = None
+    await test_db.commit()
+
+    response = await client.get(f"/v1/project/{project.id}")
+    assert response.status_code == 200
+    assert response.json()["area_of_interest"] == geojson
+
+
 @pytest.mark.asyncio
 async def test_create_project(client, geojson, geojson_file):
     project_data = {
@@ -63,3 +83,626 @@ async def test_create_project(client, geojson, geojson_file):
     assert data["description"] == ""
 
     assert data["area_of_interest"] == geojson
+
+
+@pytest.mark.asyncio
+async def test_project_list_cursor(client, create_project):
+    for name in ("project1", "project2", "project3", "project4", "project5"):
+        await create_project(name=name)
+
+    names = []
+    params = {"page_size": 2}
+    while True:
+        response = await client.get("/v1/project", params=params)
+        data = response.json()
+        names += [project["name"] for project in data["results"]]
+        if not data["has_next_page"]:
+            assert data["next_cursor"] is None
+            break
+        params = {"page_size": 2, "cursor": data["next_cursor"]}
+
+    assert names == ["project1", "project2", "project3", "project4", "project5"]
+
+
+@pytest.mark.asyncio
+async def test_project_list_invalid_cursor(client):
+    response = await client.get("/v1/project", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("page_size", [0, -1, 51])
+async def test_project_list_invalid_page_size(client, create_project, page_size):
+    await create_project()
+    response = await client.get("/v1/project", params={"page_size": page_size})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "bbox, expected_names",
+    [
+        ("-53,-6,-52,-5", ["inside"]),
+        ("-52.83,-5.65,-52.82,-5.64", ["inside"]),
+        ("10,10,20,20", ["elsewhere"]),
+        ("30,30,40,40", []),
+    ],
+)
+async def test_project_list_bbox(client, create_project, geojson, bbox, expected_names):
+    await create_project(name="inside", geojson_data=geojson)
+    await create_project(
+        name="elsewhere",
+        geojson_data={
+            "type": "Feature",
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [[[[11, 11], [12, 11], [12, 12], [11, 11]]]],
+            },
+        },
+    )
+
+    response = await client.get("/v1/project", params={"bbox": bbox})
+    assert response.status_code == 200
+    assert [project["name"] for project in response.json()["results"]] == expected_names
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bbox", ["1,2,3", "a,b,c,d", "5,0,1,1"])
+async def test_project_list_invalid_bbox(client, bbox):
+    response = await client.get("/v1/project", params={"bbox": bbox})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_projects_containing(client, app, test_db, create_project, geojson_file):
+    project = await create_project()
+    app.state.spatial_index.bulk_load(
+        await ProjectRepository(test_db).list_geometries()
+    )
+    response = await client.post(
+        "/v1/project",
+        files={"area_of_interest": geojson_file},
+        data={
+            "data": json.dumps(
+                {"name": "new", "date_range": {"start": "2025-01-01", "end": "2025-01-02"}}
+            )
+        },
+    )
+    created_id = response.json()["id"]
+
+    response = await client.get("/v1/project/contains", params={"lon": -52.83, "lat": -5.65})
+    assert response.status_code == 200
+    assert sorted(response.json()["project_ids"]) == sorted([project.id, created_id])
+
+    await client.delete(f"/v1/project/{project.id}")
+    response = await client.get("/v1/project/contains", params={"lon": -52.83, "lat": -5.65})
+    assert response.json()["project_ids"] == [created_id]
+
+
+@pytest.mark.asyncio
+async def test_spatial_index_reload_picks_up_other_workers(client, app, create_project):
+    # Written past this worker's index, as another worker would.
+    project = await create_project()
+    spatial_index = app.state.spatial_index
+    assert spatial_index.contains(-52.83, -5.65) == []
+
+    reloader = asyncio.create_task(reload_spatial_index(app.state.database, spatial_index, 0.01))
+    try:
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if spatial_index.contains(-52.83, -5.65):
+                break
+    finally:
+        reloader.cancel()
+    response = await client.get("/v1/project/contains", params={"lon": -52.83, "lat": -5.65})
+    assert response.json()["project_ids"] == [project.id]
+
+    response = await client.get("/v1/project/contains", params={"lon": 10, "lat": 10})
+    assert response.json()["project_ids"] == []
+
+
+@pytest.mark.asyncio
+async def test_create_project_from_geojson_body(client, geojson):
+    project_data = {
+        "name": "raw body",
+        "date_range": {"start": "2025-10-12", "end": "2025-10-15"},
+    }
+    response = await client.post(
+        "/v1/project/geojson",
+        params={"data": json.dumps(project_data)},
+        content=json.dumps(geojson),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "raw body"
+
+    response = await client.post(
+        "/v1/project/geojson",
+        params={"data": json.dumps(project_data)},
+        content=json.dumps(geojson),
+        headers={"Content-Type": "text/plain"},
+    )
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_replace_area_of_interest(client, create_project, geojson):
+    project = await create_project()
+    geojson["geometry"]["coordinates"] = [[[[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 1.0]]]]
+
+    response = await client.put(
+        f"/v1/project/{project.id}/area_of_interest",
+        content=json.dumps(geojson),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 200
+    assert response.json()["area_of_interest"] == geojson
+
+
+@pytest.mark.asyncio
+async def test_upload_limits(client, app, geojson, geojson_file, monkeypatch):
+    upload_settings = get_settings().upload
+    project_data = json.dumps(
+        {"name": "limits", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}}
+    )
+
+    # The parser is created with the app's lifespan.
+    monkeypatch.setattr(app.state.geojson_parser, "max_vertices", 3)
+    response = await client.post(
+        "/v1/project",
+        files={"area_of_interest": geojson_file},
+        data={"data": project_data},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["ctx"]["error"] == [
+        "The geometry has more than 3 vertices"
+    ]
+
+    monkeypatch.setattr(upload_settings, "max_bytes", 16)
+    response = await client.post(
+        "/v1/project/geojson",
+        params={"data": project_data},
+        content=json.dumps(geojson),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_multipart_upload_too_large_before_form_parsing(client, monkeypatch):
+    monkeypatch.setattr(get_settings().upload, "max_bytes", 16)
+
+    async def parse_form(*args, **kwargs):
+        raise AssertionError("form parsed")
+
+    monkeypatch.setattr(Request, "_get_form", parse_form)
+    content = b" " * (FORM_OVERHEAD_BYTES + 17)
+    response = await client.post(
+        "/v1/project",
+        files={"area_of_interest": ("big.json", content, "application/json")},
+        data={"data": "{}"},
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"] == str(UploadTooLarge(16))
+
+
+@pytest.mark.asyncio
+async def test_get_project_conditional_requests(client, create_project):
+    project = await create_project()
+
+    response = await client.get(f"/v1/project/{project.id}")
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = await client.get(
+        f"/v1/project/{project.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = await client.get(
+        f"/v1/project/{project.id}", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    response = await client.get(
+        f"/v1/project/{project.id}", headers={"If-None-Match": '"stale"'}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_get_project_etag_per_representation(client, create_project):
+    project = await create_project()
+    response = await client.get(f"/v1/project/{project.id}")
+    etag = response.headers["etag"]
+
+    etags = {etag}
+    for params in ({"zoom": 4}, {"fields": "name"}, {"zoom": 4, "fields": "area_of_interest"}):
+        response = await client.get(
+            f"/v1/project/{project.id}", params=params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        etags.add(response.headers["etag"])
+
+        response = await client.get(
+            f"/v1/project/{project.id}",
+            params=params,
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == 304
+    assert len(etags) == 4
+
+
+@pytest.mark.asyncio
+async def test_project_cache_invalidation(client, create_project, geojson):
+    project = await create_project(name="before")
+    response = await client.get(f"/v1/project/{project.id}")
+    etag = response.headers["etag"]
+    await client.get("/v1/project")
+
+    response = await client.get("/cache/stats")
+    assert response.json()["misses"] == 2
+
+    await client.get(f"/v1/project/{project.id}")
+    await client.get("/v1/project")
+    response = await client.get("/cache/stats")
+    assert response.json()["hits"] == 2
+
+    geojson["geometry"]["coordinates"] = [[[[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 1.0]]]]
+    response = await client.put(
+        f"/v1/project/{project.id}/area_of_interest",
+        content=json.dumps(geojson),
+        headers={"Content-Type": "application/geo+json"},
+    )
+
+    response = await client.get(f"/v1/project/{project.id}")
+    assert response.headers["etag"] != etag
+    assert response.json()["area_of_interest"] == geojson
+    response = await client.get("/v1/project")
+    assert response.json()["results"][0]["area_of_interest"] == geojson
+
+
+@pytest.mark.asyncio
+async def test_get_project_simplified(client, geojson):
+    ring = [
+        [-52.8 + 0.1 * math.cos(2 * math.pi * i / 1000), -5.6 + 0.1 * math.sin(2 * math.pi * i / 1000)]
+        for i in range(1000)
+    ]
+    geojson["geometry"]["coordinates"] = [[ring + [ring[0]]]]
+    response = await client.post(
+        "/v1/project/geojson",
+        params={"data": json.dumps({"name": "lod", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}})},
+        content=json.dumps(geojson),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    project_id = response.json()["id"]
+
+    response = await client.get(f"/v1/project/{project_id}")
+    assert response.json()["area_of_interest"] == geojson
+
+    vertices = []
+    for zoom in (4, 8, 12):
+        response = await client.get(f"/v1/project/{project_id}", params={"zoom": zoom})
+        simplified = response.json()["area_of_interest"]["geometry"]["coordinates"][0][0]
+        assert simplified[0] == simplified[-1]
+        vertices.append(len(simplified))
+    assert vertices == sorted(vertices)
+    assert 4 <= vertices[0] < vertices[-1] < 1001
+
+    response = await client.get(
+        "/v1/project", params={"simplify": 1, "bbox": "-53.0,-6.0,-52.0,-5.0"}
+    )
+    simplified = response.json()["results"][0]["area_of_interest"]["geometry"]["coordinates"][0][0]
+    assert len(simplified) == vertices[0]
+
+    square = [[[[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 1.0]]]]
+    geojson["geometry"]["coordinates"] = square
+    await client.put(
+        f"/v1/project/{project_id}/area_of_interest",
+        content=json.dumps(geojson),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    response = await client.get(f"/v1/project/{project_id}", params={"zoom": 4})
+    assert response.json()["area_of_interest"]["geometry"]["coordinates"] == square
+
+
+@pytest.mark.asyncio
+async def test_project_sparse_fieldsets(client, create_project, geojson):
+    project = await create_project(name="sparse")
+
+    response = await client.get("/v1/project", params={"fields": "name,date_range"})
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {
+            "id": project.id,
+            "name": "sparse",
+            "date_range": {
+                "start": project.start_date.isoformat(),
+                "end": project.end_date.isoformat(),
+            },
+        }
+    ]
+
+    response = await client.get(
+        "/v1/project",
+        params={"fields": "area_of_interest", "bbox": "-53.0,-6.0,-52.0,-5.0"},
+    )
+    assert response.json()["results"] == [
+        {"id": project.id, "area_of_interest": geojson}
+    ]
+
+    response = await client.get(f"/v1/project/{project.id}", params={"fields": "name"})
+    assert response.json() == {"id": project.id, "name": "sparse"}
+
+    response = await client.get("/v1/project", params={"fields": "name,geometry"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_import_projects(client, geojson, monkeypatch):
+    monkeypatch.setattr(get_settings().upload, "import_batch_size", 2)
+    properties = {"name": "imported", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}}
+    features = [
+        {**geojson, "properties": properties},
+        {**geojson, "properties": {**properties, "name": "x" * 33}},
+        {**geojson, "properties": properties, "geometry": {"type": "Point"}},
+        {**geojson, "properties": {**properties, "description": "nul \u0000"}},
+        {**geojson, "properties": {**properties, "name": "last"}},
+    ]
+
+    body = "\n".join(json.dumps(feature) for feature in features) + "\n\n{broken\n"
+    response = await client.post(
+        "/v1/project/import",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["created"], result["failed"]) == (2, 4)
+    assert [("id" in item) for item in result["results"]] == [True, False, False, False, True, False]
+    assert result["results"][1]["errors"][0]["loc"] == ["name"]
+    assert result["results"][2]["errors"][0]["type"] == "geojson_parsing"
+    assert result["results"][3]["errors"][0]["type"] == "database"
+
+    response = await client.get(f"/v1/project/{result['results'][4]['id']}")
+    assert response.json()["name"] == "last"
+    assert response.json()["area_of_interest"] == geojson
+
+    response = await client.post(
+        "/v1/project/import",
+        content=json.dumps({"type": "FeatureCollection", "features": features[:2]}),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert (response.json()["created"], response.json()["failed"]) == (1, 1)
+
+    response = await client.get("/v1/project", params={"page_size": 50})
+    assert response.json()["elements"] == 3
+
+    response = await client.post(
+        "/v1/project/import",
+        content=json.dumps(features[0]),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_import_too_large_reports_committed_rows(client, geojson, monkeypatch):
+    upload_settings = get_settings().upload
+    monkeypatch.setattr(upload_settings, "import_batch_size", 1)
+    properties = {"name": "imported", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}}
+    line = (json.dumps({**geojson, "properties": properties}) + "\n").encode()
+    monkeypatch.setattr(upload_settings, "import_max_bytes", len(line) * 2 + 1)
+
+    async def body():
+        # Chunked, without a Content-Length to reject the body up front.
+        for _ in range(4):
+            yield line
+
+    response = await client.post(
+        "/v1/project/import",
+        content=body(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 413
+    result = response.json()
+    assert result["created"] == 2
+    assert [item["index"] for item in result["results"]] == [0, 1]
+
+    response = await client.get("/v1/project")
+    assert sorted(project["id"] for project in response.json()["results"]) == sorted(
+        item["id"] for item in result["results"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_limits(client, geojson, monkeypatch):
+    upload_settings = get_settings().upload
+    monkeypatch.setattr(upload_settings, "import_batch_size", 1)
+    properties = {"name": "imported", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}}
+    line = json.dumps({**geojson, "properties": properties})
+    long_line = json.dumps({**geojson, "properties": {**properties, "description": "x" * 100}})
+    monkeypatch.setattr(upload_settings, "max_bytes", len(line))
+
+    response = await client.post(
+        "/v1/project/import",
+        content=f"{line}\n{long_line}\n{line}\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 413
+    assert response.json()["created"] == 1
+
+    monkeypatch.setattr(upload_settings, "import_collection_max_bytes", len(line))
+    response = await client.post(
+        "/v1/project/import",
+        content=json.dumps({"type": "FeatureCollection", "features": [json.loads(line)]}),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_export_projects(client, create_project, geojson):
+    response = await client.get("/v1/project/export", params={"format": "geojson"})
+    assert response.json() == {"type": "FeatureCollection", "features": []}
+
+    projects = [await create_project(name=f"export {i}") for i in range(3)]
+
+    response = await client.get("/v1/project/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [project.id for project in projects]
+    feature = json.loads(lines[0])
+    assert feature["geometry"] == geojson["geometry"]
+    assert feature["properties"]["name"] == "export 0"
+
+    response = await client.get("/v1/project/export", params={"format": "geojson"})
+    assert len(response.json()["features"]) == 3
+
+    response = await client.post(
+        "/v1/project/import",
+        content="\n".join(lines),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.json()["created"] == 3
+
+
+@pytest.mark.asyncio
+async def test_write_round_trips(client, create_project, geojson, query_profile):
+    project = await create_project(name="before")
+
+    with query_profile() as profile:
+        response = await client.patch(
+            f"/v1/project/{project.id}", data={"data": json.dumps({"name": "after"})}
+        )
+    assert response.status_code == 200
+    assert response.json()["name"] == "after"
+    assert response.json()["area_of_interest"] == geojson
+    assert profile.count == 1
+    assert profile.statements[0].startswith("UPDATE projects")
+    assert "areas_of_interest.geometry" not in profile.statements[0].split("RETURNING")[0]
+
+    geojson["geometry"]["coordinates"] = [[[[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 1.0]]]]
+    with query_profile() as profile:
+        response = await client.put(
+            f"/v1/project/{project.id}/area_of_interest",
+            content=json.dumps(geojson),
+            headers={"Content-Type": "application/geo+json"},
+        )
+    assert response.json()["area_of_interest"] == geojson
+    # New bytes: looked up by their hash, the geometry stored and the upload
+    # recorded, then the project updated and its previous area released.
+    assert [" ".join(statement.split()[:3]) for statement in profile.statements] == [
+        "UPDATE areas_of_interest SET",
+        "INSERT INTO areas_of_interest",
+        "INSERT INTO area_of_interest_uploads",
+        "UPDATE projects SET",
+        "UPDATE areas_of_interest SET",
+        "DELETE FROM areas_of_interest",
+    ]
+    assert "geometry" not in profile.statements[3]
+
+    with query_profile() as profile:
+        response = await client.delete(f"/v1/project/{project.id}")
+    assert response.status_code == 204
+    # The project, then its area with the last reference
+    assert profile.count == 3
+    assert profile.statements[0].startswith("DELETE FROM projects")
+
+    response = await client.delete(f"/v1/project/{project.id}")
+    assert response.status_code == 404
+    response = await client.patch(
+        f"/v1/project/{project.id}", data={"data": json.dumps({"name": "after"})}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_project_list_total(client, test_db, create_project, geojson):
+    for _ in range(3):
+        await create_project()
+
+    response = await client.get("/v1/project", params={"page_size": 2})
+    assert response.json()["total"] is None
+
+    response = await client.get("/v1/project", params={"page_size": 2, "count": "exact"})
+    assert response.json()["total"] == 3
+    assert response.json()["elements"] == 2
+
+    response = await client.post(
+        "/v1/project/geojson",
+        params={"data": json.dumps({"name": "new", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}})},
+        content=json.dumps(geojson),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    await client.delete(f"/v1/project/{response.json()['id']}")
+    await client.post(
+        "/v1/project/geojson",
+        params={"data": json.dumps({"name": "new", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}})},
+        content=json.dumps(geojson),
+        headers={"Content-Type": "application/geo+json"},
+    )
+    response = await client.get("/v1/project", params={"count": "exact"})
+    assert response.json()["total"] == 4
+
+    response = await client.get(
+        "/v1/project", params={"count": "exact", "bbox": "0.0,0.0,1.0,1.0"}
+    )
+    assert response.json()["total"] == 0
+
+    # Before ANALYZE there are no statistics and the exact count is used.
+    response = await client.get("/v1/project", params={"count": "estimated"})
+    assert response.json()["total"] == 4
+
+    await test_db.execute(text("ANALYZE projects"))
+    await test_db.commit()
+    response = await client.get("/v1/project", params={"count": "estimated"})
+    assert response.json()["total"] == 4
+
+
+@pytest.mark.asyncio
+async def test_metrics_disabled_by_default(client, create_project):
+    project = await create_project()
+
+    response = await client.get(f"/v1/project/{project.id}")
+    assert "server-timing" not in response.headers
+    response = await client.get("/metrics")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path, params, expected_count",
+    [
+        ("/v1/project/{id}", {}, 1),
+        ("/v1/project/{id}", {"zoom": 4}, 1),
+        ("/v1/project/{id}", {"fields": "name"}, 1),
+        ("/v1/project", {}, 1),
+        ("/v1/project", {"fields": "name,date_range"}, 1),
+        ("/v1/project", {"bbox": "-53.0,-6.0,-52.0,-5.0"}, 1),
+        ("/v1/project", {"count": "exact"}, 2),
+    ],
+)
+async def test_read_query_counts(
+    client, create_project, query_profile, path, params, expected_count
+):
+    projects = [await create_project() for _ in range(3)]
+
+    with query_profile() as profile:
+        response = await client.get(path.format(id=projects[0].id), params=params)
+    assert response.status_code == 200
+    assert profile.count == expected_count
+    assert profile.repeated(2) == []
+
+
+@pytest.mark.asyncio
+async def test_openapi_descriptions_from_api_docs(client):
+    response = await client.get("/openapi.json")
+    assert response.status_code == 200
+
+    paths = response.json()["paths"]
+    assert paths["/v1/project"]["post"]["description"] == (
+        (API_DOCS / "create_project.md").read_text().strip()
+    )
+    assert paths["/v1/project/import"]["post"]["description"].strip()
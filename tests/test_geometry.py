@@ -0,0 +1,32 @@
+from src.geometry import PackedMultiPolygon, pack_multipolygon
+
+COORDINATES = [
+    [
+        [[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 0.0]],
+        [[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 1.0]],
+    ],
+    [
+        [
+            [-52.8430645648562, -5.63351005831322],
+            [-52.8, -5.6],
+            [-52.9, -5.7],
+            [-52.8430645648562, -5.63351005831322],
+        ]
+    ],
+]
+
+
+def test_packed_multipolygon_round_trip():
+    packed = PackedMultiPolygon(pack_multipolygon(COORDINATES))
+
+    assert len(packed) == 2
+    assert packed.coordinates() == COORDINATES
+    assert packed.bounding_box() == (-52.9, -5.7, 10.0, 10.0)
+
+
+def test_packed_multipolygon_ring_views():
+    packed = PackedMultiPolygon(pack_multipolygon(COORDINATES))
+
+    lons, lats = packed.ring(1)
+    assert lons.tolist() == [1.0, 2.0, 2.0, 1.0]
+    assert lats.tolist() == [1.0, 1.0, 2.0, 1.0]
@@ -0,0 +1,42 @@
+import os
+
+from src.config import get_settings
+from src.main import uvicorn_options
+
+
+def test_uvicorn_options():
+    settings = get_settings().model_copy(update={"is_debug": True})
+    assert uvicorn_options(settings) == {"reload": True}
+
+    server = settings.server.model_copy(update={"workers": 4, "keep_alive": 75})
+    settings = settings.model_copy(update={"is_debug": False, "server": server})
+    options = uvicorn_options(settings)
+    assert options["workers"] == 4
+    assert options["timeout_keep_alive"] == 75
+    assert options["timeout_graceful_shutdown"] == 30
+    assert (options["loop"], options["http"]) == ("auto", "auto")
+
+    server = server.model_copy(update={"workers": 0})
+    options = uvicorn_options(settings.model_copy(update={"server": server}))
+    assert options["workers"] == os.cpu_count()
+
+
+def test_uvicorn_options_warn_about_process_local_state(caplog):
+    settings = get_settings()
+    server = settings.server.model_copy(update={"workers": 2})
+    settings = settings.model_copy(update={"is_debug": False, "server": server})
+    uvicorn_options(settings)
+    assert "separate response caches" in caplog.text
+    assert "SPATIAL_INDEX__RELOAD_SECONDS" in caplog.text
+
+    caplog.clear()
+    settings = settings.model_copy(
+        update={
+            "cache": settings.cache.model_copy(update={"enabled": False}),
+            "spatial_index": settings.spatial_index.model_copy(update={"reload_seconds": 10}),
+        }
+    )
+    uvicorn_options(settings)
+    server = server.model_copy(update={"workers": 1})
+    uvicorn_options(get_settings().model_copy(update={"is_debug": False, "server": server}))
+    assert caplog.text == ""
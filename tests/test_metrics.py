@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from src.config import get_settings
+from src.metrics import Metrics, start_timings, stop_timings, timed
+
+
+@pytest.fixture(autouse=True)
+def enable_metrics(monkeypatch):
+    monkeypatch.setattr(get_settings().metrics, "enabled", True)
+
+
+def test_timed_counts_nested_phases_once():
+    timings, token = start_timings()
+    try:
+        with timed("db"):
+            with timed("db"):
+                pass
+            with timed("parse"):
+                pass
+    finally:
+        stop_timings(token)
+
+    assert set(timings.phases) == {"db", "parse"}
+    assert timings.phases["db"] >= timings.phases["parse"]
+    assert timings.active == set()
+
+
+def test_metrics_render_cumulative_histograms():
+    metrics = Metrics()
+    metrics.observe("GET", "/v1/project", 200, 0.003, {"db": 0.002})
+    metrics.observe("GET", "/v1/project", 200, 0.2, {"db": 0.15})
+
+    text = metrics.render()
+
+    assert 'http_requests_total{method="GET",route="/v1/project",status="200"} 2' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/v1/project",le="0.005"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/v1/project",le="0.25"} 2' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/v1/project",le="+Inf"} 2' in text
+    assert (
+        'http_request_phase_duration_seconds_count{method="GET",route="/v1/project",phase="db"} 2'
+        in text
+    )
+
+
+@pytest.mark.asyncio
+async def test_server_timing_and_metrics(client, geojson_file):
+    project_data = {
+        "name": "timed",
+        "date_range": {"start": "2025-10-12", "end": "2025-10-15"},
+    }
+    response = await client.post(
+        "/v1/project",
+        files={"area_of_interest": geojson_file},
+        data={"data": json.dumps(project_data)},
+    )
+    assert response.status_code == 200
+
+    phases = {
+        metric.split(";")[0] for metric in response.headers["server-timing"].split(", ")
+    }
+    assert {"multipart", "validate", "upload", "parse", "db", "encode", "total"} <= phases
+
+    response = await client.get(f"/v1/project/{response.json()['id']}")
+    assert "db" in response.headers["server-timing"]
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_requests_total{method="POST",route="/v1/project",status="200"} 1'
+        in response.text
+    )
+    assert (
+        'http_request_phase_duration_seconds_count{method="POST",route="/v1/project",phase="parse"} 1'
+        in response.text
+    )
+    assert 'route="/v1/project/{project_id}"' in response.text
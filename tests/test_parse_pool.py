@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+
+import pytest
+import pytest_asyncio
+
+from benchmarks.synthetic import multipolygon_feature
+from src.exceptions import GeoJSONParseException, ParseTimeout
+from src.parse_pool import ParsePool
+from src.parsers import GeoJsonParser
+from src.services import prepare_area_of_interest
+
+
+@pytest_asyncio.fixture
+async def parse_pool():
+    pool = ParsePool(workers=1, inline_max_bytes=1024, timeout=30)
+    pool.start()
+    await pool.warm_up("src.services")
+    yield pool
+    await pool.shutdown()
+
+
+async def max_loop_gap(task) -> float:
+    """Longest time the event loop was blocked while ``task`` ran."""
+    gap, last = 0.0, time.perf_counter()
+    while not task.done():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        gap, last = max(gap, now - last), now
+    await task
+    return gap
+
+
+@pytest.mark.asyncio
+async def test_parse_pool_matches_inline(parse_pool, geojson):
+    data = json.dumps(geojson).encode()
+
+    assert not parse_pool.offloads(len(data))
+    assert parse_pool.offloads(2048)
+    prepared = await parse_pool.run(prepare_area_of_interest, GeoJsonParser(), data)
+    assert prepared == prepare_area_of_interest(GeoJsonParser(), data)
+
+    with pytest.raises(GeoJSONParseException) as error:
+        await parse_pool.run(prepare_area_of_interest, GeoJsonParser(), b"{")
+    assert error.value.message.startswith("The uploaded GeoJSON file could not be loaded")
+
+
+@pytest.mark.asyncio
+async def test_parse_pool_timeout(parse_pool, geojson):
+    parse_pool.timeout = 0.1
+    with pytest.raises(ParseTimeout):
+        await parse_pool.run(time.sleep, 1)
+
+    # The worker finishes the abandoned call, then serves the next one.
+    parse_pool.timeout = 30
+    data = json.dumps(geojson).encode()
+    assert await parse_pool.run(prepare_area_of_interest, GeoJsonParser(), data)
+
+
+@pytest.mark.asyncio
+async def test_parse_pool_keeps_event_loop_responsive(parse_pool):
+    data = json.dumps(multipolygon_feature(200_000)).encode()
+    parser = GeoJsonParser()
+
+    async def parse_inline():
+        return prepare_area_of_interest(parser, data)
+
+    inline_gap = await max_loop_gap(asyncio.create_task(parse_inline()))
+    pool_gap = await max_loop_gap(
+        asyncio.create_task(parse_pool.run(prepare_area_of_interest, parser, data))
+    )
+
+    assert pool_gap < inline_gap / 4
+
+
+@pytest.mark.asyncio
+async def test_create_endpoint_keeps_event_loop_responsive(client, app, parse_pool):
+    data = json.dumps(
+        {"name": "pooled", "date_range": {"start": "2025-01-01", "end": "2025-01-31"}}
+    )
+
+    # Distinct geometries, a known upload would not be parsed again.
+    inline_body, pool_body = (
+        json.dumps(multipolygon_feature(vertices)) for vertices in (200_000, 200_001)
+    )
+
+    async def create(body: str):
+        response = await client.post(
+            "/v1/project/geojson",
+            params={"data": data},
+            content=body,
+            headers={"Content-Type": "application/geo+json"},
+        )
+        assert response.status_code == 200
+
+    inline_gap = await max_loop_gap(asyncio.create_task(create(inline_body)))
+    app.state.parse_pool = parse_pool
+    pool_gap = await max_loop_gap(asyncio.create_task(create(pool_body)))
+
+    assert pool_gap < inline_gap / 2
+
+
+@pytest.mark.asyncio
+async def test_create_project_in_parse_pool(client, app, parse_pool, geojson):
+    app.state.parse_pool = parse_pool
+    parse_pool.inline_max_bytes = 0
+    data = {"name": "pooled", "date_range": {"start": "2025-01-01", "end": "2025-01-31"}}
+
+    async def create(feature):
+        return await client.post(
+            "/v1/project/geojson",
+            params={"data": json.dumps(data)},
+            content=json.dumps(feature),
+            headers={"Content-Type": "application/geo+json"},
+        )
+
+    response = await create(geojson)
+    assert response.status_code == 200
+    assert response.json()["area_of_interest"] == geojson
+
+    parse_pool.timeout = 0.01
+    response = await create(multipolygon_feature(200_000))
+    assert response.status_code == 503
+    assert response.json() == {
+        "detail": "Processing the area of interest took longer than 0.01 seconds."
+    }
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from src.exceptions import GeoJSONParseException
+from src.parsers import CONTENT_ERROR, LOAD_ERROR, GeoJsonParser
+
+RING = [[0, 0], [1, 0], [1, 1], [0, 0]]
+
+
+def feature(coordinates, geometry_type="MultiPolygon", feature_type="Feature") -> bytes:
+    return json.dumps(
+        {
+            "type": feature_type,
+            "geometry": {"type": geometry_type, "coordinates": coordinates},
+        }
+    ).encode()
+
+
+def test_load_valid_feature_keeps_full_precision():
+    ring = [[0.123456789, 0], [1, 0], [1, 1], [0.123456789, 0]]
+
+    assert GeoJsonParser().load(feature([[ring]])) == {
+        "type": "Feature",
+        "geometry": {
+            "type": "MultiPolygon",
+            "coordinates": [[[[0.123456789, 0.0], [1.0, 0.0], [1.0, 1.0], [0.123456789, 0.0]]]],
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "data, message, errors",
+    [
+        (b'{"type": ', LOAD_ERROR, ["Expecting value: line 1 column 10 (char 9)"]),
+        (feature([[RING]], feature_type="Foo"), CONTENT_ERROR, ["Input should be 'Feature'"]),
+        (feature([[RING]], geometry_type="Polygon"), CONTENT_ERROR, ["Input should be 'MultiPolygon'"]),
+        (b'{"type": "Feature"}', CONTENT_ERROR, ["Input should be a valid dictionary or instance of Geometry"]),
+        (
+            feature([[[[0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 0, 1]]]]),
+            CONTENT_ERROR,
+            ["Tuple should have at most 2 items after validation, not 3"] * 4,
+        ),
+        (
+            feature([[[[0, 0], [1, 0], [1, 1], [0, 1]]]]),
+            CONTENT_ERROR,
+            ["Each linear ring must end where it started"],
+        ),
+        (
+            feature([[[[0, 0], [1, 0], [0, 0]]]]),
+            CONTENT_ERROR,
+            ["Each linear ring must contain at least 4 positions"],
+        ),
+        (feature([]), CONTENT_ERROR, ["The geometry must contain at least one linear ring"]),
+    ],
+)
+def test_load_errors(data, message, errors):
+    with pytest.raises(GeoJSONParseException) as ex:
+        GeoJsonParser().load(data)
+
+    assert ex.value.message == message
+    assert ex.value.errors == errors
@@ -0,0 +1,54 @@
+import logging
+
+import pytest
+from sqlalchemy import select, text
+
+from src.config import get_settings
+from src.models import Project
+
+
+@pytest.fixture(autouse=True)
+def enable_profiler(monkeypatch):
+    settings = get_settings().profiler
+    monkeypatch.setattr(settings, "enabled", True)
+    monkeypatch.setattr(settings, "query_budget", 0)
+    monkeypatch.setattr(settings, "slow_query_ms", 0)
+
+
+@pytest.mark.asyncio
+async def test_query_profile(test_db, create_project, query_profile):
+    projects = [await create_project() for _ in range(3)]
+
+    with query_profile(slowest=2) as profile:
+        for project in projects:
+            await test_db.scalar(select(Project.name).where(Project.id == project.id))
+        await test_db.execute(text("SELECT pg_sleep(0.01)"))
+
+    assert profile.count == 4
+    assert profile.rows == 4
+    assert profile.total_seconds >= 0.01
+    assert len(profile.slowest) == 2
+    assert profile.slowest[0][1] == "SELECT pg_sleep(0.01)"
+    [(shape, count)] = profile.repeated(3)
+    assert shape.startswith("SELECT projects.name FROM projects WHERE projects.id = ")
+    assert count == 3
+
+    await test_db.scalar(select(Project.name))
+    assert profile.count == 4
+
+
+@pytest.mark.asyncio
+async def test_profiler_middleware_logs(client, create_project, query_profile, caplog):
+    # The lifespan hooks the app's engines, query_profile the test engine used here.
+    project = await create_project()
+
+    with caplog.at_level(logging.WARNING):
+        response = await client.get(f"/v1/project/{project.id}")
+    assert response.status_code == 200
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any(message.startswith("Slow query") for message in messages)
+    assert any(
+        f"GET /v1/project/{project.id} ran 1 statements, over the budget of 0" in message
+        for message in messages
+    )
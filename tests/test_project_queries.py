@@ -0,0 +1,188 @@
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from src.repositories import ProjectRepository
+
+SEEDED_PROJECTS = 50_000
+
+
+async def seed_projects(session, count: int) -> None:
+    await session.execute(
+        text(
+            """
+            INSERT INTO projects (id, name, description, start_date, end_date)
+            SELECT 'seed-' || n,
+                   'project ' || n,
+                   'site ' || (n % 1000) || ' block ' || (n % 997),
+                   DATE '2015-01-01' + (n % 3650),
+                   DATE '2015-01-01' + (n % 3650) + 30 + n % 60
+            FROM generate_series(1, :count) AS n
+            """
+        ),
+        {"count": count},
+    )
+    await session.commit()
+    await session.execute(text("ANALYZE projects"))
+
+
+async def explain(session, query) -> str:
+    sql = query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    plan = await session.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    return json.dumps(plan)
+
+
+def select_list(query) -> str:
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    return sql[: sql.index("\nFROM projects")]
+
+
+ACTIVE = (date(2020, 1, 1), date(2020, 1, 10))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "kwargs, index",
+    [
+        ({"sort": "start_date", "fields": ("id", "name")}, "ix_projects_start_date_id"),
+        ({"sort": "-end_date", "fields": ("id", "name")}, "ix_projects_end_date_id"),
+        ({"sort": "name", "after": ("project 5", "seed-5")}, "ix_projects_name_id"),
+        ({"sort": "created"}, "ix_projects_created_id"),
+    ],
+)
+async def test_list_query_uses_indexes(test_db, kwargs, index):
+    await seed_projects(test_db, SEEDED_PROJECTS)
+    query = ProjectRepository(test_db).list_query(limit=11, **kwargs)
+
+    assert index in await explain(test_db, query)
+
+
+@pytest.mark.asyncio
+async def test_list_page_uses_index_only_scan(test_db):
+    await seed_projects(test_db, SEEDED_PROJECTS)
+    query = ProjectRepository(test_db).list_query(
+        limit=11, fields=("date_range", "id", "name")
+    )
+
+    plan = await explain(test_db, query)
+    assert "Index Only Scan" in plan
+    assert "ix_projects_created_id" in plan
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"bbox": (0, 0, 1, 1)}])
+def test_list_query_reads_packed_geometry_only_without_text(kwargs):
+    columns = select_list(ProjectRepository(None).list_query(limit=11, **kwargs))
+    assert "geojson_text" in columns
+    # Only within CASE WHEN geojson_text IS NULL THEN geometry END.
+    assert columns.count(".geometry") == 1
+    assert "IS NULL) THEN areas_of_interest" in columns
+
+
+def test_level_list_query_reads_only_the_level_text():
+    columns = select_list(ProjectRepository(None).list_query(limit=11, level=8))
+    assert "coalesce((SELECT area_of_interest_levels.geojson_text" in columns
+    assert "areas_of_interest_1.geojson_text," not in columns
+    assert columns.count(".geometry") == 1
+
+
+@pytest.mark.asyncio
+async def test_active_filter_uses_indexes(test_db):
+    await seed_projects(test_db, SEEDED_PROJECTS)
+    repo = ProjectRepository(test_db)
+
+    # Without a LIMIT the range index is the only way around a full scan.
+    count = repo.count_query(active=ACTIVE)
+    assert "ix_projects_active_range" in await explain(test_db, count)
+
+    # A page may instead walk the sort index and filter, never the whole table.
+    for sort in ("created", "start_date", "-end_date", "name"):
+        page = repo.list_query(
+            limit=11, active=ACTIVE, sort=sort, fields=("id", "name")
+        )
+        assert "Seq Scan" not in await explain(test_db, page)
+
+
+@pytest.mark.asyncio
+async def test_project_list_active_and_sort(client, create_project):
+    await create_project(name="b", start_date=date(2024, 1, 1), end_date=date(2024, 1, 31))
+    await create_project(name="a", start_date=date(2024, 2, 1), end_date=date(2024, 3, 31))
+    await create_project(name="c", start_date=date(2024, 3, 15), end_date=date(2024, 4, 30))
+
+    async def names(**params):
+        response = await client.get("/v1/project", params=params)
+        assert response.status_code == 200, response.json()
+        return [project["name"] for project in response.json()["results"]]
+
+    assert await names(active_from="2024-01-31", active_to="2024-02-01") == ["b", "a"]
+    assert await names(active_from="2024-04-01") == ["c"]
+    assert await names(active_to="2023-12-31") == []
+    assert await names(sort="name") == ["a", "b", "c"]
+    assert await names(sort="-end_date") == ["c", "a", "b"]
+
+    response = await client.get(
+        "/v1/project",
+        params={"sort": "-name", "page_size": 2, "fields": "name", "count": "exact"},
+    )
+    assert [project["name"] for project in response.json()["results"]] == ["c", "b"]
+    assert response.json()["total"] == 3
+    cursor = response.json()["next_cursor"]
+    assert await names(sort="-name", page_size=2, cursor=cursor) == ["a"]
+
+    response = await client.get("/v1/project", params={"cursor": cursor})
+    assert response.status_code == 400
+    response = await client.get("/v1/project", params={"sort": "description"})
+    assert response.status_code == 422
+    response = await client.get(
+        "/v1/project", params={"active_from": "2024-02-01", "active_to": "2024-01-01"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_search_uses_index(test_db):
+    await seed_projects(test_db, SEEDED_PROJECTS)
+    repo = ProjectRepository(test_db)
+
+    count = repo.count_query(search="4242")
+    assert "ix_projects_search_vector" in await explain(test_db, count)
+    page = repo.list_query(limit=11, search="4242", sort="rank")
+    assert "ix_projects_search_vector" in await explain(test_db, page)
+
+
+@pytest.mark.asyncio
+async def test_project_list_search(client, create_project):
+    await create_project(name="Forest survey", description="Oak and beech stands")
+    await create_project(name="Wheat fields", description="Survey of the forest edge")
+    await create_project(name="Lake", description="Water quality survey")
+
+    async def names(**params):
+        response = await client.get("/v1/project", params=params)
+        assert response.status_code == 200, response.json()
+        return [project["name"] for project in response.json()["results"]]
+
+    # A match in the name ranks above one in the description.
+    assert await names(q="forest") == ["Forest survey", "Wheat fields"]
+    assert await names(q="oak") == ["Forest survey"]
+    assert await names(q="survey -forest") == ["Lake"]
+    assert await names(q='"forest edge"') == ["Wheat fields"]
+    assert await names(q="mountain") == []
+    assert await names(q="survey", sort="name") == ["Forest survey", "Lake", "Wheat fields"]
+
+    response = await client.get(
+        "/v1/project", params={"q": "survey", "page_size": 2, "count": "exact"}
+    )
+    first_page = [project["name"] for project in response.json()["results"]]
+    assert response.json()["total"] == 3
+    cursor = response.json()["next_cursor"]
+    second_page = await names(q="survey", page_size=2, cursor=cursor)
+    assert sorted(first_page + second_page) == ["Forest survey", "Lake", "Wheat fields"]
+
+    response = await client.get("/v1/project", params={"sort": "rank"})
+    assert response.status_code == 422
+    response = await client.get("/v1/project", params={"q": ""})
+    assert response.status_code == 422
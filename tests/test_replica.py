@@ -0,0 +1,113 @@
+import json
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config import ReplicaSettings, get_settings
+from src.infrastucture.db import Base, create_engine
+from src.models import AreaOfInterest, Project
+from tests.conftest import create_test_database
+
+REPLICA_DATABASE_NAME = "test_database_replica"
+
+
+@pytest_asyncio.fixture
+async def replica(app, monkeypatch):
+    """Second database standing in for a replica that has not caught up.
+
+    Set REPLICA__* to point it at another Postgres instance.
+    """
+    settings = get_settings()
+    replica_settings = ReplicaSettings(
+        **(settings.replica or settings.database).model_dump(exclude={"db"}),
+        db=REPLICA_DATABASE_NAME,
+    )
+    create_test_database(replica_settings, REPLICA_DATABASE_NAME)
+    replica_engine = create_engine(replica_settings)
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    monkeypatch.setattr(settings, "replica", replica_settings)
+    monkeypatch.setattr(
+        app.state.database,
+        "replica_session",
+        async_sessionmaker(replica_engine, expire_on_commit=False),
+    )
+    yield
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_until_write(app, replica, geojson):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as writer, AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as reader:
+        response = await writer.post(
+            "/v1/project/geojson",
+            params={"data": json.dumps({"name": "primary", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}})},
+            content=json.dumps(geojson),
+            headers={"Content-Type": "application/geo+json"},
+        )
+        assert response.status_code == 200
+        assert "read_primary" in response.cookies
+        project_id = response.json()["id"]
+
+        response = await writer.get(f"/v1/project/{project_id}")
+        assert response.status_code == 200
+
+        response = await reader.get(f"/v1/project/{project_id}")
+        assert response.status_code == 404
+        response = await reader.get("/v1/project")
+        assert response.json()["results"] == []
+
+        response = await reader.get("/v1/project", headers={"X-Read-Primary": "1"})
+        assert [project["id"] for project in response.json()["results"]] == [project_id]
+
+
+@pytest.mark.asyncio
+async def test_primary_reads_skip_cache_filled_from_replica(app, replica, geojson):
+    assert app.state.project_cache is not None
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as writer, AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as reader:
+        response = await writer.post(
+            "/v1/project/geojson",
+            params={"data": json.dumps({"name": "old", "date_range": {"start": "2025-10-12", "end": "2025-10-15"}})},
+            content=json.dumps(geojson),
+            headers={"Content-Type": "application/geo+json"},
+        )
+        project_id = response.json()["id"]
+        # The replica has caught up with the create, not with the update below.
+        async with app.state.database.replica_session() as session:
+            session.add(
+                Project(
+                    id=project_id,
+                    name="old",
+                    start_date=date(2025, 10, 12),
+                    end_date=date(2025, 10, 15),
+                    area_of_interest=AreaOfInterest(geojson_data=geojson),
+                )
+            )
+            await session.commit()
+
+        response = await writer.patch(
+            f"/v1/project/{project_id}", data={"data": json.dumps({"name": "new"})}
+        )
+        assert response.json()["name"] == "new"
+        assert "read_primary" in response.cookies
+
+        # Caches the stale version after the update cleared the cache.
+        response = await reader.get(f"/v1/project/{project_id}")
+        assert response.json()["name"] == "old"
+        response = await reader.get("/v1/project")
+        assert [project["name"] for project in response.json()["results"]] == ["old"]
+
+        response = await writer.get(f"/v1/project/{project_id}")
+        assert response.json()["name"] == "new"
+        response = await writer.get("/v1/project")
+        assert [project["name"] for project in response.json()["results"]] == ["new"]
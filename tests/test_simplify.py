@@ -0,0 +1,64 @@
+import math
+
+from src.simplify import (LEVELS, pixel_size, select_level,
+                          simplify_levels, simplify_multipolygon)
+
+
+def circle(vertices, radius=1.0):
+    ring = [
+        [radius * math.cos(2 * math.pi * i / vertices), radius * math.sin(2 * math.pi * i / vertices)]
+        for i in range(vertices)
+    ]
+    return ring + [ring[0]]
+
+
+def test_select_level():
+    assert select_level() is None
+    assert select_level(zoom=0) == LEVELS[0]
+    assert select_level(zoom=LEVELS[1]) == LEVELS[1]
+    assert select_level(zoom=LEVELS[-1] + 1) is None
+    assert select_level(tolerance=pixel_size(LEVELS[-1])) == LEVELS[-1]
+    assert select_level(zoom=0, tolerance=pixel_size(30)) is None
+
+
+def test_simplify_keeps_rings_closed():
+    coordinates = [[circle(1000), circle(1000, radius=0.5)]]
+
+    simplified = simplify_multipolygon(coordinates, 0.01)
+
+    for ring in simplified[0]:
+        assert 4 <= len(ring) < 1001
+        assert ring[0] == ring[-1]
+
+
+def test_simplify_drops_collapsed_rings():
+    coordinates = [[circle(100), circle(100, radius=1e-6)], [circle(100, radius=1e-6)]]
+
+    simplified = simplify_multipolygon(coordinates, 0.01)
+
+    assert len(simplified) == 1
+    assert len(simplified[0]) == 1
+
+
+def test_simplify_keeps_one_polygon():
+    simplified = simplify_multipolygon([[circle(100, radius=1e-6)]], 1.0)
+
+    assert len(simplified) == 1
+    assert len(simplified[0][0]) == 4
+    assert simplified[0][0][0] == simplified[0][0][-1]
+
+
+def test_simplify_keeps_collinear_ring():
+    # Collapses below every tolerance but has no triangle to fall back to.
+    coordinates = [[[[0.0, 0.0], [1e-5, 0.0], [2e-5, 0.0], [0.0, 0.0]]]]
+
+    assert simplify_multipolygon(coordinates, 1.0) == coordinates
+    assert simplify_levels(coordinates) == {}
+
+
+def test_simplify_levels_get_coarser():
+    levels = simplify_levels([[circle(1000)]])
+
+    vertices = [len(levels[level][0][0]) for level in sorted(levels)]
+    assert vertices == sorted(vertices)
+    assert simplify_levels([[[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]]]]) == {}
@@ -0,0 +1,85 @@
+import random
+
+from src.geometry import pack_multipolygon
+from src.spatial_index import SpatialIndex
+
+SQUARE_WITH_HOLE = pack_multipolygon(
+    [
+        [
+            [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]],
+            [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]],
+        ]
+    ]
+)
+
+
+def square(x: float, y: float, size: float = 1) -> bytes:
+    return pack_multipolygon(
+        [[[[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]]]
+    )
+
+
+def test_contains_respects_holes():
+    index = SpatialIndex()
+    index.bulk_load([("a", SQUARE_WITH_HOLE)])
+
+    assert index.contains(1, 1) == ["a"]
+    assert index.contains(5, 5) == []
+    assert index.contains(11, 5) == []
+
+
+def test_bulk_load_matches_brute_force():
+    rng = random.Random(0)
+    squares = {
+        str(i): (rng.uniform(-170, 170), rng.uniform(-80, 80)) for i in range(2000)
+    }
+    index = SpatialIndex()
+    index.bulk_load((key, square(x, y, 5)) for key, (x, y) in squares.items())
+
+    for _ in range(200):
+        lon, lat = rng.uniform(-170, 170), rng.uniform(-80, 80)
+        expected = {
+            key for key, (x, y) in squares.items() if x < lon < x + 5 and y < lat < y + 5
+        }
+        assert set(index.contains(lon, lat)) == expected
+
+
+def test_incremental_updates():
+    index = SpatialIndex(rebuild_threshold=2)
+    index.bulk_load([("a", square(0, 0))])
+
+    index.insert("b", square(5, 5))
+    assert index.contains(5.5, 5.5) == ["b"]
+
+    index.insert("a", square(20, 20))
+    assert index.contains(0.5, 0.5) == []
+    assert index.contains(20.5, 20.5) == ["a"]
+
+    index.remove("b")
+    assert index.contains(5.5, 5.5) == []
+    assert len(index) == 1
+
+
+def test_reload_replays_changes_made_while_loading():
+    index = SpatialIndex()
+    index.bulk_load([("a", square(0, 0)), ("b", square(5, 5))])
+
+    index.start_reload()
+    # Read from the database before this worker's changes.
+    snapshot = [("a", square(0, 0)), ("b", square(5, 5)), ("other", square(9, 9))]
+    index.remove("a")
+    index.insert("c", square(20, 20))
+    reloaded = SpatialIndex()
+    reloaded.bulk_load(snapshot)
+    index.finish_reload(reloaded)
+
+    assert index.contains(0.5, 0.5) == []
+    assert index.contains(20.5, 20.5) == ["c"]
+    assert index.contains(9.5, 9.5) == ["other"]
+    assert len(index) == 3
+
+    # Later changes are not recorded any more.
+    index.remove("c")
+    index.start_reload()
+    index.finish_reload(None)
+    assert index.contains(20.5, 20.5) == []